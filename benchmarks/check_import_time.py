@@ -0,0 +1,70 @@
+"""Check the start-up import time of the Swiss Chess app against a budget, based on `python -X importtime`.
+
+Run from the root of the repository, it exits with an error when the import is over budget or when a heavy
+dependency that should be imported on first use is imported at start-up:
+
+    python benchmarks/check_import_time.py --budget 1.5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+MODULE = "swiss_chess.main"
+BUDGET_SECONDS = 1.5
+# Dependencies that are only needed for pairing fallbacks, figures, images and puzzle battles. They dominate the
+# start-up time, so the app imports them inside the functions that use them.
+LAZY_MODULES = ["networkx", "scipy", "matplotlib", "skimage", "PIL", "pandas", "chess", "requests"]
+
+
+def import_times(module: str) -> Dict[str, float]:
+    """Import a module in a fresh interpreter and return the cumulative import time of every module in seconds."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def check(module: str, budget: float, repeat: int, lazy_modules: List[str]) -> List[str]:
+    """Return the failures of the import time check, the fastest of `repeat` imports is compared to the budget."""
+    runs = [import_times(module) for _ in range(repeat)]
+    seconds = min(times[module] for times in runs)
+    print(f"{module}: {seconds:.3f}s (budget {budget:.3f}s)")
+
+    failures = []
+    if seconds > budget:
+        failures.append(f"{module} takes {seconds:.3f}s to import, over the budget of {budget:.3f}s")
+    for name in lazy_modules:
+        if name in runs[0]:
+            failures.append(f"{name} is imported at start-up, it should be imported on first use")
+    return failures
+
+
+def main():
+    """Run the import time check from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=MODULE)
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="Budget in seconds.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = check(args.module, args.budget, args.repeat, LAZY_MODULES)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Benchmarks of pairing, standings and rendering of the Swiss Chess tournament at realistic field sizes.
+
+Run from the root of the repository, the package is imported from the repository and the player images are loaded
+from data/images:
+
+    python benchmarks/run_benchmarks.py --output benchmarks.json
+
+Every benchmark runs on the state of a simulated tournament after 5 to 11 rounds, without network or display:
+matplotlib uses the Agg backend, Streamlit is imported but runs without a server, and the Streamlit columns of the
+standings are replaced by a stub that only records the calls. The run exits with an error when a benchmark fails,
+after writing the results.
+Real events are benchmarked on their state after the rounds of their tournament report file:
+
+    python benchmarks/run_benchmarks.py --trf event.trf --sizes
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Callable, Dict, Iterator, List, Optional
+
+import matplotlib
+
+matplotlib.use("Agg")
+# The package is imported from the repository, also when it is not installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scipy.optimize import linear_sum_assignment  # noqa: E402
+
+from swiss_chess.utils.figures import render_png  # noqa: E402
+from swiss_chess.utils.pairing import PAIRING_METHODS, create_cost_matrix, get_pairs_sophisticated  # noqa: E402
+from swiss_chess.utils.plotting import show_standings  # noqa: E402
+from swiss_chess.utils.podium import create_podium  # noqa: E402
+from swiss_chess.utils.scoring import determine_secondary_points  # noqa: E402
+from swiss_chess.utils.tournament import Tournament  # noqa: E402
+from swiss_chess.utils.trf import load_trf  # noqa: E402
+
+SIZES = [8, 32, 128, 512, 2048]
+
+# Benchmarks that are too slow to run above a number of players
+MAX_PLAYERS = {
+    "get_pairs[graph]": 128,
+}
+
+
+class StubColumn:
+    """Stand-in for a Streamlit column that records the calls instead of rendering them."""
+
+    def __init__(self):
+        """Initialize the stub."""
+        self.calls = 0
+
+    def __getattr__(self, name: str) -> Callable:
+        """Return a function that only counts the call and returns the default value of an input."""
+
+        def record(*args, **kwargs):
+            self.calls += 1
+            return kwargs.get("value")
+
+        return record
+
+
+def rounds_for(n_players: int) -> int:
+    """Number of simulated rounds for a field size, between 5 and 11."""
+    return min(max(n_players.bit_length() + 1, 5), 11)
+
+
+def simulate_tournament(n_players: int, rounds: int, seed: int = 42) -> Tournament:
+    """Play a tournament with random results to get a realistic state."""
+    rng = random.Random(seed)
+    tournament = Tournament([f"Player {i}" for i in range(n_players)], "score_groups")
+    for _ in range(rounds):
+        pairs = tournament.pair_round()
+        tournament.record_results([rng.choice(["draw", pair[0].name, pair[1].name]) for pair in pairs])
+    return tournament
+
+
+def time_call(function: Callable, repeat: int) -> List[float]:
+    """Time a call a number of times."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def render_podium(tournament: Tournament):
+    """Draw the podium and render it to PNG, without the figure cache."""
+    render_png(create_podium(tournament.players, third_place_match=False, finals_mode=False))
+
+
+def benchmarks(tournament: Tournament) -> Dict[str, Callable]:
+    """Create the benchmarked calls on the state of a tournament."""
+    players = sorted(tournament.players, key=lambda x: x.points)
+    players = players[: len(players) - len(players) % 2]
+    cost_matrix = create_cost_matrix(players)
+    row_indices, col_indices = linear_sum_assignment(cost_matrix)
+
+    calls: Dict[str, Callable] = {
+        "create_cost_matrix": lambda: create_cost_matrix(players),
+        "linear_sum_assignment": lambda: linear_sum_assignment(cost_matrix),
+        "get_pairs_sophisticated": lambda: get_pairs_sophisticated(players, list(row_indices), list(col_indices)),
+        "determine_secondary_points": lambda: determine_secondary_points(tournament.players, tournament.tiebreaker),
+        "show_standings": lambda: show_standings(tournament.players, StubColumn(), tournament.tiebreaker),
+        "create_podium": lambda: render_podium(tournament),
+    }
+    for method, get_pairs in PAIRING_METHODS.items():
+        calls[f"get_pairs[{method}]"] = lambda get_pairs=get_pairs: get_pairs(players, cost_matrix)
+    return calls
+
+
+def tournaments(sizes: List[int], trf_paths: List[str]) -> Iterator[tuple[Dict, Tournament]]:
+    """Simulated tournaments of every field size and replayed events, one at a time."""
+    for n_players in sizes:
+        yield {}, simulate_tournament(n_players, rounds_for(n_players))
+    for path in trf_paths:
+        yield {"trf": path}, load_trf(path, "score_groups")
+
+
+def run(
+    sizes: List[int], repeat: int, only: Optional[List[str]] = None, trf_paths: Optional[List[str]] = None
+) -> List[Dict]:
+    """Run the benchmarks for every field size and every tournament report file."""
+    results = []
+    for source, tournament in tournaments(sizes, trf_paths or []):
+        n_players = len(tournament.players)
+        for name, call in benchmarks(tournament).items():
+            if only and name not in only:
+                continue
+            result = {
+                "benchmark": name,
+                "players": n_players,
+                "rounds": tournament.round_number,
+                "repeat": repeat,
+                **source,
+            }
+            if n_players > MAX_PLAYERS.get(name, n_players):
+                result["status"] = "skipped"
+            else:
+                try:
+                    timings = time_call(call, repeat)
+                except Exception as e:
+                    result.update({"status": "error", "error": f"{type(e).__name__}: {e}"[:200]})
+                else:
+                    result.update(
+                        {"status": "ok", "seconds_min": min(timings), "seconds_median": statistics.median(timings)}
+                    )
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+    return results
+
+
+def package_version() -> str:
+    """Version of the installed swiss_chess package."""
+    try:
+        return metadata.version("swiss_chess")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def main():
+    """Run the benchmarks and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="Names of the benchmarks to run.")
+    parser.add_argument("--trf", nargs="+", default=[], help="Tournament report files of real events.")
+    parser.add_argument("--output", default="benchmarks.json")
+    args = parser.parse_args()
+
+    report = {
+        "version": package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "results": run(args.sizes, args.repeat, args.only, args.trf),
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    errors = [result for result in report["results"] if result["status"] == "error"]
+    for result in errors:
+        print(f"{result['benchmark']} with {result['players']} players failed: {result['error']}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
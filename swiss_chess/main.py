@@ -1,22 +1,69 @@
 """Main file to run the Swiss Chess tournament."""
+import os
 import random
-from typing import List
+import uuid
+from typing import Dict, List, Optional
 
 import streamlit as st
 
+from swiss_chess.utils.diagnostics import Diagnostic
+from swiss_chess.utils.event_log import LOG_DIR, EventLog, log_path
 from swiss_chess.utils.finals import create_finals, create_semis
-from swiss_chess.utils.pairing import pairing
+from swiss_chess.utils.history import open_history
+from swiss_chess.utils.pairing import PAIRING_METHODS
 from swiss_chess.utils.player import Player
 from swiss_chess.utils.plotting import show_standings
-from swiss_chess.utils.podium import create_podium
-from swiss_chess.utils.puzzle_battle import determine_rounds_standings
-from swiss_chess.utils.rounds import collect_results
+from swiss_chess.utils.podium import podium_png
+from swiss_chess.utils.puzzle_battle import determine_rounds_standings, prefetch_puzzles, restore_puzzle_battles
+from swiss_chess.utils.ratings import open_rating_store
+from swiss_chess.utils.rounds import cached_pairing, collect_results, restore_rounds, round_summary, submitted_results
+from swiss_chess.utils.tiebreaks import TIEBREAKERS
+from swiss_chess.utils.tournament import Tournament
+from swiss_chess.utils.trf import trf_lines
 
 st.cache_data()
 
 
+def restore_session(record: Dict):
+    """Restore the tournament from the record of the event log, without pairing the rounds again."""
+    if not record["players"]:
+        return
+    if record.get("tournament") is not None:
+        st.session_state["tournament_id"] = record["tournament"]
+    st.session_state["player_names"] = list(record["players"])
+    st.session_state["shuffled_players"] = list(record["players"])
+    st.session_state["start_button"] = True
+    restore_rounds(record["rounds"])
+    restore_puzzle_battles(record["puzzle_battles"])
+
+
+def open_event_log() -> Optional[EventLog]:
+    """Open the event log of the tournament, restoring the session from it when it is first opened."""
+    with st.sidebar:
+        log_name = st.text_input(
+            "Tournament log name",
+            "",
+            help=f"File name of the log in {LOG_DIR}, leave empty to not keep a log of the tournament.",
+        )
+    if not log_name:
+        return None
+    try:
+        path = log_path(log_name)
+    except ValueError as error:
+        st.error(str(error))
+        return None
+
+    if st.session_state.get("event_log_path") != path:
+        event_log = EventLog(path)
+        st.session_state["event_log"] = event_log
+        st.session_state["event_log_path"] = path
+        restore_session(event_log.record)
+    return st.session_state["event_log"]
+
+
 def sidebar_input():
     """Create the sidebar for the input of the Swiss Chess tournament."""
+    event_log = open_event_log()
     if "player_names" not in st.session_state:
         st.session_state["player_names"] = [""]
 
@@ -36,7 +83,8 @@ def sidebar_input():
 
         with st.expander("Additional settings", False):
             seed = int(st.text_input("Seed", "42"))
-            tiebreaker = st.selectbox("Tiebreaker", ["Opponent points", "Puzzle battle"])
+            tiebreaker = st.selectbox("Tiebreaker", TIEBREAKERS)
+            pairing_method = st.selectbox("Pairing method", list(PAIRING_METHODS))
             third_place_match = st.checkbox("Third place match", False)
             finals_mode = st.checkbox("Create final bracket", True)
 
@@ -50,34 +98,100 @@ def sidebar_input():
 
     if "shuffled_players" not in st.session_state:
         random.Random(seed).shuffle(players)
-        st.session_state["shuffled_players"] = players
+        # Seeded by rating, the shuffle only orders players with the same rating
+        ratings = open_rating_store().ratings_of(players)
+        players = [players[i] for i in sorted(range(len(players)), key=lambda i: -ratings[i])]
+        st.session_state["shuffled_players"] = list(players)
+        if event_log is not None:
+            event_log.register_players(players)
     else:
         players = st.session_state["shuffled_players"]
 
-    all_players = []
-    for player in players:
-        all_players.append(Player(player))
+    # The tournament keeps its ID when the session is restored from the event log
+    if "tournament_id" not in st.session_state:
+        st.session_state["tournament_id"] = uuid.uuid4().hex
+    if event_log is not None:
+        event_log.log_tournament(st.session_state["tournament_id"])
+
+    # The ratings and the earlier games at the start are used for the whole tournament
+    if "player_ratings" not in st.session_state:
+        st.session_state["player_ratings"] = open_rating_store().ratings_of(players)
+    if "history_tournament" not in st.session_state:
+        history = open_history()
+        log_name = os.path.basename(st.session_state.get("event_log_path", ""))
+        st.session_state["history_tournament"] = history.start_tournament(st.session_state["tournament_id"], log_name)
+        st.session_state["met_before"] = history.met_before(players, st.session_state["history_tournament"])
+    tournament = Tournament(
+        players,
+        pairing_method,
+        tiebreaker,
+        on_diagnostic=show_diagnostic,
+        ratings=st.session_state["player_ratings"],
+        met_before=st.session_state["met_before"],
+    )
+
+    return rounds, tournament, third_place_match, finals_mode
+
+
+def show_diagnostic(diagnostic: Diagnostic):
+    """Show a diagnostic of the tournament engine."""
+    getattr(st, diagnostic.level)(diagnostic.message)
+
+
+def round_height(all_players: List[Player]) -> int:
+    """Height of the container of a round."""
+    extra = 0
+    if len(all_players) % 2 != 0:
+        extra = 38
+    return 160 + (len(all_players) // 2) * 80 + extra
+
 
-    return rounds, all_players, third_place_match, tiebreaker, finals_mode
+@st.fragment
+def play_round(tournament: Tournament, round_number: int):
+    """Show the round that is played, only this fragment reruns when its results are changed."""
+    all_players = tournament.players
+    with st.container(height=round_height(all_players), border=True):
+        col1, col2, col3 = st.columns([2, 0.2, 1])
 
+        col1.write(f"## Round {round_number + 1}:")
+        col2.empty()
 
-def create_rounds(all_players: List[Player], rounds: int):
+        winners = collect_results(tournament.pairs[-1], tournament.colors[-1], round_number, col1)
+        show_standings(all_players, col3, tournament.tiebreaker, key=f"standings_{round_number}")
+
+    if winners is not None:
+        # The submitted round changes the rest of the page
+        st.rerun()
+
+
+def show_finished_round(tournament: Tournament, round_number: int, winners: List[str]):
+    """Show a static summary of a finished round with the standings after it."""
+    with st.expander(f"Round {round_number + 1}: finished", False):
+        col1, col2, col3 = st.columns([2, 0.2, 1])
+        col1.dataframe(round_summary(tournament.pairs[-1], tournament.colors[-1], winners), hide_index=True)
+        col2.empty()
+        show_standings(tournament.players, col3, tournament.tiebreaker, key=f"standings_{round_number}")
+
+
+def create_rounds(tournament: Tournament, rounds: int):
     """Create the rounds of the Swiss Chess tournament."""
-    extra = 0
-    if len(all_players) % 2 != 0:
-        extra = 38
     with st.expander("Rounds", True):
         for round in range(rounds):
-            with st.container(height=160 + (len(all_players) // 2) * 80 + extra, border=True):
-                col1, col2, col3 = st.columns([2, 0.2, 1])
-
-                col1.write(f"## Round {round + 1}:")
-                pairs = pairing(all_players)
+            pairs = cached_pairing(tournament, round)
+            winners = submitted_results(pairs, round)
+            if winners is None:
+                if round == rounds - 1:
+                    # Puzzles for the tie-break battles are fetched while the last round is played
+                    prefetch_puzzles(tournament)
+                play_round(tournament, round)
+                st.stop()
 
-                col2.empty()
+            tournament.record_results(winners)
+            show_finished_round(tournament, round, winners)
 
-                collect_results(all_players, pairs, round, col1)
-                show_standings(all_players, col3)
+        st.download_button(
+            "Download tournament report (TRF)", "\n".join(trf_lines(tournament)) + "\n", file_name="swiss_chess.trf"
+        )
 
 
 def check_min_players(all_players: List[Player], min_players: int):
@@ -90,17 +204,18 @@ def check_min_players(all_players: List[Player], min_players: int):
 def main() -> List[Player]:
     """Run the main function of the Swiss Chess tournament format."""
     st.set_page_config(page_title="Swiss Chess", page_icon="data/images/pikapolice.jpg", layout="wide")
-    rounds, all_players, third_place_match, tiebreaker, finals_mode = sidebar_input()
+    rounds, tournament, third_place_match, finals_mode = sidebar_input()
+    all_players = tournament.players
 
     # Minimum players check
     check_min_players(all_players, min_players=4)
 
     # Rounds
-    create_rounds(all_players, rounds)
+    create_rounds(tournament, rounds)
 
     # Puzzle battle
     with st.expander("Puzzle Battle", True):
-        sorted_players = determine_rounds_standings(all_players, tiebreaker)
+        sorted_players = determine_rounds_standings(tournament)
 
     # Semi-final and final
     if finals_mode:
@@ -112,8 +227,7 @@ def main() -> List[Player]:
 
     # Podium
     with st.expander("Podium", True):
-        fig = create_podium(all_players, third_place_match, finals_mode)
-        st.pyplot(fig)
+        st.image(podium_png(all_players, third_place_match, finals_mode))
 
     return all_players
 
@@ -0,0 +1,44 @@
+"""Diagnostics emitted by the tournament logic instead of calling the user interface directly."""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger("swiss_chess")
+
+
+class Diagnostic:
+    """Message of the tournament logic with a level, 'info', 'warning' or 'error'."""
+
+    def __init__(self, level: str, message: str):
+        """Initialize the diagnostic."""
+        self.level = level
+        self.message = message
+
+    def __repr__(self) -> str:
+        """Represent the diagnostic."""
+        return f"Diagnostic({self.level!r}, {self.message!r})"
+
+
+diagnostics_handler: ContextVar[Optional[Callable[[Diagnostic], None]]] = ContextVar(
+    "diagnostics_handler", default=None
+)
+
+
+def emit(level: str, message: str):
+    """Emit a diagnostic to the active handler, or to the logger if there is none."""
+    handler = diagnostics_handler.get()
+    if handler is None:
+        logger.log(logging.getLevelName(level.upper()), message)
+    else:
+        handler(Diagnostic(level, message))
+
+
+@contextmanager
+def handle_diagnostics(handler: Callable[[Diagnostic], None]) -> Iterator[None]:
+    """Send the diagnostics emitted inside the context to the handler."""
+    token = diagnostics_handler.set(handler)
+    try:
+        yield
+    finally:
+        diagnostics_handler.reset(token)
@@ -0,0 +1,166 @@
+"""Append-only event log of the Swiss Chess tournament, with compact snapshots for fast recovery."""
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+LOG_DIR = "data/logs"
+SNAPSHOT_INTERVAL = 500
+READ_BLOCK = 4096
+
+
+def log_path(name: str, log_dir: str = LOG_DIR) -> str:
+    """Path of a log file in the log directory, only a plain file name inside the directory is accepted."""
+    directory = os.path.realpath(log_dir)
+    path = os.path.realpath(os.path.join(directory, name))
+    if not name or os.path.basename(name) != name or os.path.dirname(path) != directory:
+        raise ValueError(f"The log name {name!r} is not a file name in {log_dir}.")
+    os.makedirs(directory, exist_ok=True)
+    return path
+
+
+def empty_record() -> Dict:
+    """Create the record of a tournament without any events."""
+    return {"tournament": None, "players": [], "rounds": {}, "puzzle_battles": {}}
+
+
+def apply_event(record: Dict, event: Dict):
+    """Apply one event to the tournament record."""
+    kind = event["event"]
+    if kind == "tournament":
+        record["tournament"] = event["id"]
+    elif kind == "register":
+        record["players"].append(event["name"])
+    elif kind == "pairing":
+        record["rounds"][str(event["round"])] = {
+            "fingerprint": event["fingerprint"],
+            "pairs": event["pairs"],
+            "bye": event["bye"],
+            "results": {},
+            "submitted": False,
+        }
+    elif kind == "result":
+        round_record = record["rounds"][str(event["round"])]
+        round_record["results"][f"{event['player1']}|{event['player2']}"] = event["winner"]
+    elif kind == "submit":
+        record["rounds"][str(event["round"])]["submitted"] = True
+    elif kind == "puzzle_battle":
+        record["puzzle_battles"][str(event["battle"])] = {key: value for key, value in event.items() if key != "event"}
+    else:
+        raise ValueError(f"Unknown event {kind}")
+
+
+class EventLog:
+    """Append-only JSON lines file with one event per line and a periodic snapshot of the replayed record."""
+
+    def __init__(self, path: str, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """Open the event log and replay it from the last snapshot."""
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.snapshot_interval = snapshot_interval
+        self.drop_torn_line()
+        self.record, offset = self.load_snapshot()
+        self.events_since_snapshot = 0
+        for event in self.events(offset):
+            apply_event(self.record, event)
+            self.events_since_snapshot += 1
+
+    def drop_torn_line(self):
+        """Cut a last line without a newline, left by a crash while appending, so new events start on a new line."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(position - READ_BLOCK, 0)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                file.truncate(position)
+
+    def load_snapshot(self) -> tuple[Dict, int]:
+        """Load the last snapshot and the log offset it covers, or an empty record."""
+        if not os.path.exists(self.snapshot_path):
+            return empty_record(), 0
+        with open(self.snapshot_path, encoding="utf-8") as file:
+            snapshot = json.load(file)
+        return snapshot["record"], snapshot["offset"]
+
+    def events(self, offset: int = 0) -> Iterator[Dict]:
+        """Iterate over the events in the log, starting at a byte offset."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if line.endswith(b"\n"):
+                    yield json.loads(line)
+
+    def write_snapshot(self):
+        """Write the replayed record with the current end of the log, replacing the previous snapshot atomically."""
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"offset": offset, "record": self.record}, file, separators=(",", ":"))
+        os.replace(temporary_path, self.snapshot_path)
+        self.events_since_snapshot = 0
+
+    def append(self, events: List[Dict]):
+        """Append events to the log and apply them to the record."""
+        if not events:
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+            file.flush()
+            os.fsync(file.fileno())
+        for event in events:
+            apply_event(self.record, event)
+        self.events_since_snapshot += len(events)
+        if self.events_since_snapshot >= self.snapshot_interval:
+            self.write_snapshot()
+
+    def log_tournament(self, tournament_id: str):
+        """Log the ID of the tournament, it identifies the tournament in the history when the session is restored."""
+        if self.record.get("tournament") != tournament_id:
+            self.append([{"event": "tournament", "id": tournament_id}])
+
+    def register_players(self, names: List[str]):
+        """Log the registration of the players, in their shuffled order."""
+        registered = set(self.record["players"])
+        self.append([{"event": "register", "name": name} for name in names if name not in registered])
+
+    def log_pairing(self, round_number: int, fingerprint: str, pairs: List[tuple[str, str]], bye: Optional[str]):
+        """Log the pairing of a round."""
+        self.append(
+            [
+                {
+                    "event": "pairing",
+                    "round": round_number,
+                    "fingerprint": fingerprint,
+                    "pairs": [list(pair) for pair in pairs],
+                    "bye": bye,
+                }
+            ]
+        )
+
+    def log_results(self, round_number: int, pairs: List[tuple[str, str]], winners: List[str]):
+        """Log the submitted results of a round, only the ones that changed since the last time."""
+        round_record = self.record["rounds"].get(str(round_number), {"results": {}, "submitted": False})
+        events: List[Dict] = [
+            {"event": "result", "round": round_number, "player1": player1, "player2": player2, "winner": winner}
+            for (player1, player2), winner in zip(pairs, winners)
+            if round_record["results"].get(f"{player1}|{player2}") != winner
+        ]
+        if not round_record["submitted"]:
+            events.append({"event": "submit", "round": round_number})
+        self.append(events)
+
+    def log_puzzle_battle(self, battle: int, player1: str, player2: str, rating: int, moves: int, winner: str):
+        """Log the outcome of a puzzle battle, if it changed since the last time."""
+        outcome = {"player1": player1, "player2": player2, "rating": rating, "moves": moves, "winner": winner}
+        if self.record["puzzle_battles"].get(str(battle)) != {"battle": battle, **outcome}:
+            self.append([{"event": "puzzle_battle", "battle": battle, **outcome}])
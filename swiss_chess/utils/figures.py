@@ -0,0 +1,61 @@
+"""Render matplotlib figures to PNG once, and reuse the bytes as long as the inputs of the figure are unchanged."""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+FIGURE_DPI = 200
+MAX_FIGURES = 32
+
+
+def figure_key(*inputs) -> str:
+    """Hash the inputs a figure is drawn from."""
+    return hashlib.sha1(repr(inputs).encode()).hexdigest()
+
+
+def render_png(fig: "Figure") -> bytes:
+    """Render a figure on the Agg backend and release it."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    buffer = io.BytesIO()
+    try:
+        FigureCanvasAgg(fig)
+        fig.savefig(buffer, format="png", dpi=FIGURE_DPI, bbox_inches="tight")
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Least recently used cache of rendered figures, shared by all sessions."""
+
+    def __init__(self, max_figures: int = MAX_FIGURES):
+        """Initialize the empty cache."""
+        self.max_figures = max_figures
+        self.figures: OrderedDict[str, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of figures in the cache."""
+        return len(self.figures)
+
+    def get(self, key: str, draw: Callable[[], "Figure"]) -> bytes:
+        """Return the PNG of a figure, drawing and rendering it only if its key is not in the cache."""
+        with self.lock:
+            if key in self.figures:
+                self.figures.move_to_end(key)
+                return self.figures[key]
+        png = render_png(draw())
+        with self.lock:
+            self.figures[key] = png
+            self.figures.move_to_end(key)
+            while len(self.figures) > self.max_figures:
+                self.figures.popitem(last=False)
+        return png
+
+
+figure_cache = FigureCache()
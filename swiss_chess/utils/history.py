@@ -0,0 +1,147 @@
+"""SQLite history of the players, tournaments, rounds and games of all tournaments played with the app."""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+HISTORY_PATH = "data/history.sqlite"
+
+# Every game is stored once per player, so the games of a player and against an opponent are index range scans
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    started TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id),
+    number INTEGER NOT NULL,
+    UNIQUE (tournament_id, number)
+);
+CREATE TABLE IF NOT EXISTS games (
+    round_id INTEGER NOT NULL REFERENCES rounds (id),
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    opponent_id INTEGER NOT NULL REFERENCES players (id),
+    color TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (round_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS games_player ON games (player_id, opponent_id);
+CREATE INDEX IF NOT EXISTS games_opponent ON games (opponent_id);
+CREATE INDEX IF NOT EXISTS rounds_tournament ON rounds (tournament_id);
+"""
+
+# The statements are constant, so the connection prepares each of them once and reuses it from its statement cache
+INSERT_PLAYER = "INSERT OR IGNORE INTO players (name) VALUES (?)"
+INSERT_TOURNAMENT = "INSERT OR IGNORE INTO tournaments (key, name, started) VALUES (?, ?, ?)"
+TOURNAMENT_ID = "SELECT id FROM tournaments WHERE key = ?"
+INSERT_ROUND = "INSERT OR IGNORE INTO rounds (tournament_id, number) VALUES (?, ?)"
+ROUND_ID = "SELECT id FROM rounds WHERE tournament_id = ? AND number = ?"
+DELETE_GAMES = "DELETE FROM games WHERE round_id = ?"
+INSERT_GAME = """
+INSERT INTO games (round_id, player_id, opponent_id, color, score)
+VALUES (?, (SELECT id FROM players WHERE name = ?), (SELECT id FROM players WHERE name = ?), ?, ?)
+"""
+HEAD_TO_HEAD = """
+SELECT COUNT(*), COALESCE(SUM(score), 0) FROM games
+WHERE player_id = (SELECT id FROM players WHERE name = ?) AND opponent_id = (SELECT id FROM players WHERE name = ?)
+"""
+COLOUR_HISTORY = """
+SELECT players.name, SUM(games.color = 'white'), SUM(games.color = 'black') FROM games
+JOIN players ON players.id = games.player_id
+WHERE players.name IN (SELECT value FROM json_each(?))
+GROUP BY players.name
+"""
+MET_BEFORE = """
+SELECT DISTINCT player.name, opponent.name FROM games
+JOIN players AS player ON player.id = games.player_id
+JOIN players AS opponent ON opponent.id = games.opponent_id
+JOIN rounds ON rounds.id = games.round_id
+WHERE player.name IN (SELECT value FROM json_each(?))
+AND opponent.name IN (SELECT value FROM json_each(?))
+AND rounds.tournament_id != ?
+"""
+
+
+class History:
+    """Players, tournaments, rounds and games in a local SQLite database, shared by all sessions of the app."""
+
+    def __init__(self, path: str = HISTORY_PATH):
+        """Open the database, creating the tables and indexes if they do not exist."""
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def start_tournament(self, key: str, name: str = "") -> int:
+        """Add a tournament with a unique key and return its ID, a tournament with the key already is continued."""
+        started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.lock, self.connection:
+            self.connection.execute(INSERT_TOURNAMENT, (key, name, started))
+            return self.connection.execute(TOURNAMENT_ID, (key,)).fetchone()[0]
+
+    def record_round(
+        self,
+        tournament_id: int,
+        round_number: int,
+        pairs: Sequence[tuple[str, str]],
+        colors: Sequence[tuple[str, str]],
+        scores: Sequence[float],
+    ):
+        """Store the games of a round in one transaction, `scores` are the scores of the first player of every pair.
+
+        A round that is recorded again replaces its games.
+        """
+        games = []
+        for (first, second), (first_color, second_color), score in zip(pairs, colors, scores):
+            games.append((first, second, first_color, float(score)))
+            games.append((second, first, second_color, 1.0 - float(score)))
+        with self.lock, self.connection:
+            self.connection.executemany(INSERT_PLAYER, [(name,) for pair in pairs for name in pair])
+            self.connection.execute(INSERT_ROUND, (tournament_id, round_number))
+            round_id = self.connection.execute(ROUND_ID, (tournament_id, round_number)).fetchone()[0]
+            self.connection.execute(DELETE_GAMES, (round_id,))
+            self.connection.executemany(INSERT_GAME, [(round_id, *game) for game in games])
+
+    def head_to_head(self, player: str, opponent: str) -> tuple[int, float]:
+        """Number of games of a player against an opponent, and the points the player scored in them."""
+        with self.lock:
+            games, points = self.connection.execute(HEAD_TO_HEAD, (player, opponent)).fetchone()
+        return games, points
+
+    def colour_history(self, names: Sequence[str]) -> Dict[str, tuple[int, int]]:
+        """Number of games with white and with black in all tournaments of every player that played before."""
+        with self.lock:
+            rows = self.connection.execute(COLOUR_HISTORY, (json.dumps(list(names)),)).fetchall()
+        return {name: (white, black) for name, white, black in rows}
+
+    def met_before(self, names: Sequence[str], tournament_id: int = -1) -> List[tuple[str, str]]:
+        """Pairs of the players that played each other in other tournaments than `tournament_id`."""
+        names_json = json.dumps(list(names))
+        with self.lock:
+            rows = self.connection.execute(MET_BEFORE, (names_json, names_json, tournament_id)).fetchall()
+        return [(player, opponent) for player, opponent in rows]
+
+
+@lru_cache(maxsize=None)
+def open_history(path: str = HISTORY_PATH) -> History:
+    """Open the history database once per process."""
+    return History(path)
@@ -0,0 +1,110 @@
+"""Process-wide stores of decoded and rescaled images, shared by all players, figures and sessions."""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+IMAGE_DIR = "data/images"
+FALLBACK_IMAGE = "pikapolice.jpg"
+# Figures draw images at most 100 pixels high, twice that keeps them sharp on high resolution screens
+THUMBNAIL_HEIGHT = 200
+MAX_IMAGES = 256
+# Height in pixels of an image drawn with zoom 1
+DRAWN_HEIGHT = 100
+
+
+def image_path(name: str) -> str:
+    """Path of the image of a player, or of the fallback image if the player has none."""
+    path = os.path.join(IMAGE_DIR, f"{name}.png")
+    if os.path.exists(path):
+        return path
+    return os.path.join(IMAGE_DIR, FALLBACK_IMAGE)
+
+
+def pawn_path(color: str) -> str:
+    """Path of the image of a pawn of a colour."""
+    return os.path.join(IMAGE_DIR, f"{color}_pawn.png")
+
+
+def load_thumbnail(path: str, height: int = THUMBNAIL_HEIGHT) -> np.ndarray:
+    """Decode an image as a read-only uint8 RGB(A) array, downscaled to at most `height` pixels high."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        if img.height > height:
+            img = img.resize((max(1, round(img.width * height / img.height)), height), Image.LANCZOS)
+        thumbnail = np.asarray(img, dtype=np.uint8)
+    thumbnail.setflags(write=False)
+    return thumbnail
+
+
+def rescale_image(img: np.ndarray, height: int) -> np.ndarray:
+    """Rescale an image to a height with anti-aliasing, as a read-only float array."""
+    from skimage import transform
+
+    scaled = transform.rescale(img, height / img.shape[0], channel_axis=2, anti_aliasing=True).astype(np.float32)
+    scaled.setflags(write=False)
+    return scaled
+
+
+class ImageStore:
+    """Least recently used cache of decoded images, keyed by source so players without image share the fallback."""
+
+    def __init__(self, max_images: int = MAX_IMAGES):
+        """Initialize the empty store."""
+        self.max_images = max_images
+        self.images: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        # Streamlit runs every session in its own thread of the same process
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of images in the store."""
+        return len(self.images)
+
+    def get(self, key: Hashable, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the image of a key, loading it on first use and evicting the least recently used."""
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+                return self.images[key]
+        img = load()
+        with self.lock:
+            self.images[key] = img
+            self.images.move_to_end(key)
+            while len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+        return img
+
+    def nbytes(self) -> int:
+        """Memory used by the images in the store."""
+        with self.lock:
+            return sum(image.nbytes for image in self.images.values())
+
+    def clear(self):
+        """Remove all images from the store."""
+        with self.lock:
+            self.images.clear()
+
+
+image_store = ImageStore()
+scaled_image_store = ImageStore()
+
+
+def source_image(path: str) -> np.ndarray:
+    """Thumbnail of an image file from the shared store."""
+    return image_store.get(path, lambda: load_thumbnail(path))
+
+
+def player_image(name: str) -> np.ndarray:
+    """Thumbnail of the image of a player from the shared store."""
+    return source_image(image_path(name))
+
+
+def scaled_image(path: str, zoom: float, height: int = DRAWN_HEIGHT) -> np.ndarray:
+    """Image file rescaled to `height` times `zoom` pixels, computed once and shared across figures and sessions."""
+    return scaled_image_store.get(
+        (path, height, zoom), lambda: rescale_image(source_image(path), max(1, round(height * zoom)))
+    )
@@ -1,12 +1,36 @@
 """Find the optimal pairing for the rounds of the Swiss Chess tournament."""
-from typing import List
+import time
+from itertools import combinations, groupby
+from typing import List, Optional
 
-import networkx as nx
 import numpy as np
-import streamlit as st
-from scipy.optimize import linear_sum_assignment
 
+from swiss_chess.utils.diagnostics import emit
 from swiss_chess.utils.player import Player
+from swiss_chess.utils.state import player_ids, points_vector, ratings_vector, shared_state
+
+REMATCH_COST = 100
+SELF_PAIR_COST = 999
+MAX_EXACT_GROUP_SIZE = 12
+SPARSE_NEIGHBOURS = 4
+SPARSE_WINDOW = 64
+ANYTIME_TIME_BUDGET = 1.0
+# Total weight of the rating differences in the cost, below the cost of the smallest difference in points
+RATING_COST = 0.2
+RATING_SPREAD = 400
+# Cost of pairing players that met in an earlier tournament, between the rating costs and half a point difference
+HISTORY_COST = 0.2
+
+
+class PairingError(Exception):
+    """Raised when none of the pairing methods found a pairing, the players need to be paired by hand."""
+
+    def __init__(self, players: List[Player], row_indices: List[int], col_indices: List[int]):
+        """Initialize the error with the players and the assignment found by the Hungarian algorithm."""
+        super().__init__("All pairing methods failed, provide pairing by hand")
+        self.players = players
+        self.row_indices = row_indices
+        self.col_indices = col_indices
 
 
 def take_odd_player_out(sorted_players: List[Player]):
@@ -16,7 +40,7 @@ def take_odd_player_out(sorted_players: List[Player]):
         if player.no_game_found == 0:
             odd_player = sorted_players.pop(player_loc)
             odd_player.add_no_game()
-            st.warning(f"Player {odd_player.name} has no pair.")
+            emit("warning", f"Player {odd_player.name} has no pair.")
             break
         player_loc += 1
     return sorted_players
@@ -24,6 +48,8 @@ def take_odd_player_out(sorted_players: List[Player]):
 
 def get_pairs(players: List[Player], cost_matrix: np.array) -> List[tuple[Player, Player]]:
     """Get the optimal pairs of players based on the cost matrix using nx Graph method."""
+    import networkx as nx
+
     # Assuming `symmetric_cost_matrix` is the symmetric cost matrix already generated
     # Create an undirected graph
     G = nx.Graph()
@@ -43,176 +69,379 @@ def get_pairs(players: List[Player], cost_matrix: np.array) -> List[tuple[Player
     return pairs
 
 
-def get_pairs_sophisticated(players: List[Player], row_indices: List[int], col_indices: List[int]):
-    """Get the optimal pairs of players based on the cost matrix using the sophisticated Hungarian algorithm."""
-    solutionlist1 = []
-    solutionlist2 = []
-    already_assigned = []
-    for i in range(8):
-        if i not in already_assigned:
-            if (row_indices[i] not in solutionlist1) & (col_indices[i] not in solutionlist1):
-                solutionlist1.append(row_indices[i])
-                solutionlist1.append(col_indices[i])
-                already_assigned.append(i)
-                prev_assigned = "list1"
-            else:
-                solutionlist2.append(row_indices[i])
-                solutionlist2.append(col_indices[i])
-                already_assigned.append(i)
-                prev_assigned = "list2"
-            j = col_indices.index(row_indices[i])
-            k = row_indices.index(col_indices[i])
-            while (j not in already_assigned) | (k not in already_assigned):
-                if j not in already_assigned:
-                    if prev_assigned == "list1":
-                        solutionlist2.append(row_indices[j])
-                        solutionlist2.append(col_indices[j])
-                    else:
-                        solutionlist1.append(row_indices[j])
-                        solutionlist1.append(col_indices[j])
-                    already_assigned.append(j)
-                if k not in already_assigned:
-                    if prev_assigned == "list1":
-                        solutionlist2.append(row_indices[k])
-                        solutionlist2.append(col_indices[k])
-                    else:
-                        solutionlist1.append(row_indices[k])
-                        solutionlist1.append(col_indices[k])
-                    already_assigned.append(k)
-                if prev_assigned == "list1":
-                    prev_assigned = "list2"
-                else:
-                    prev_assigned = "list1"
-                j = col_indices.index(row_indices[k])
-                k = row_indices.index(col_indices[k])
-
-    assert len(solutionlist1) == len(solutionlist2), f"{solutionlist1} and {solutionlist2}"
-
-    first_score = sum(
-        [
-            abs(players[solutionlist1[i]].points - players[solutionlist1[i + 1]].points)
-            for i in range(0, len(solutionlist1), 2)
-        ]
-    )
-    second_score = sum(
-        [
-            abs(players[solutionlist2[i]].points - players[solutionlist2[i + 1]].points)
-            for i in range(0, len(solutionlist2), 2)
-        ]
-    )
+def match_score_group(group: List[int], cost_matrix: np.array, max_group_size: int) -> List[tuple[int, int]]:
+    """Pair an even score group, exact matching for small groups and top half vs bottom half for large ones."""
+    import networkx as nx
+    from scipy.optimize import linear_sum_assignment
 
-    # Filter out pairs where a player is paired with itself
-    if first_score <= second_score:
-        pairs = [(players[solutionlist1[i]], players[solutionlist1[i + 1]]) for i in range(0, len(solutionlist1), 2)]
-    else:
-        pairs = [(players[solutionlist2[i]], players[solutionlist2[i + 1]]) for i in range(0, len(solutionlist2), 2)]
+    if len(group) <= max_group_size:
+        G = nx.Graph()
+        G.add_nodes_from(group)
+        G.add_weighted_edges_from((i, j, cost_matrix[i][j]) for i, j in combinations(group, 2))
+        return list(nx.algorithms.matching.min_weight_matching(G, weight="weight"))
 
-    return pairs
+    half = len(group) // 2
+    top, bottom = group[:half], group[half:]
+    row_indices, col_indices = linear_sum_assignment(cost_matrix[np.ix_(top, bottom)])
+    return [(top[r], bottom[c]) for r, c in zip(row_indices, col_indices)]
 
 
-def get_pairs_simple(
-    players: List[Player], row_indices: List[int], col_indices: List[int]
+def get_pairs_score_groups(
+    players: List[Player], cost_matrix: np.array, max_group_size: int = MAX_EXACT_GROUP_SIZE
 ) -> List[tuple[Player, Player]]:
-    """Get the optimal pairs of players based on the cost matrix using the simple Hungarian algorithm."""
-    first_pairing = [row_indices[0], col_indices[0]]
-    second_pairing = []
-    first_score = abs(players[row_indices[0]].points - players[col_indices[0]].points)
-    second_score = 0.0
-    for x in range(1, len(row_indices)):
-        if (row_indices[x] in first_pairing) | (col_indices[x] in first_pairing):
-            second_pairing.append(row_indices[x])
-            second_pairing.append(col_indices[x])
-            second_score += abs(players[row_indices[x]].points - players[col_indices[x]].points)
+    """Get the pairs of players score group by score group, floating unpaired players down (Dutch style)."""
+    order = sorted(range(len(players)), key=lambda i: players[i].points, reverse=True)
+    rank = {i: r for r, i in enumerate(order)}
+    opponents = create_opponent_matrix(players)
+    groups = [list(group) for _, group in groupby(order, key=lambda i: players[i].points)]
+
+    group_pairs: List[List[tuple[int, int]]] = []
+    floaters: List[int] = []
+    for group_number, group in enumerate(groups):
+        candidates = floaters + group
+        floaters = []
+        is_last_group = group_number == len(groups) - 1
+        if len(candidates) % 2 != 0:
+            floaters.append(candidates.pop())
+
+        group_pairs.append([])
+        for i, j in match_score_group(candidates, cost_matrix, max_group_size):
+            if opponents[i, j] and not is_last_group:
+                # Rematch inside this score group, try again in the next one
+                floaters.extend((i, j))
+            else:
+                group_pairs[-1].append((i, j))
+
+    # Rematches left in the last group, merge it with the groups above until they can be avoided
+    last_pairs = group_pairs.pop()
+    while group_pairs and any(opponents[i, j] for i, j in last_pairs):
+        pool = [player for pair in group_pairs.pop() + last_pairs for player in pair]
+        last_pairs = match_score_group(sorted(pool, key=rank.get), cost_matrix, max_group_size)
+    group_pairs.append(last_pairs)
+
+    return [(players[i], players[j]) for pairs in group_pairs for i, j in pairs]
+
+
+def nearest_opponents(position: int, order: np.ndarray, points: np.ndarray, opponents: np.ndarray, k: int):
+    """Yield up to k players closest in points to the player at this position of the order, skipping rematches."""
+    i = order[position]
+    left, right = position - 1, position + 1
+    found = 0
+    while found < k and (left >= 0 or right < len(order)):
+        go_left = right >= len(order) or (
+            left >= 0 and points[i] - points[order[left]] <= points[order[right]] - points[i]
+        )
+        if go_left:
+            j, left = order[left], left - 1
         else:
-            first_pairing.append(row_indices[x])
-            first_pairing.append(col_indices[x])
-            first_score += abs(players[row_indices[x]].points - players[col_indices[x]].points)
-
-    assert len(first_pairing) == len(second_pairing), f"{first_pairing} and {second_pairing}"
+            j, right = order[right], right + 1
+        if not opponents[i, j]:
+            found += 1
+            yield j
+
+
+def sparse_window_matching(
+    window: List[int], points: np.ndarray, cost_matrix: np.array, opponents: np.ndarray, k: int, complete: bool
+) -> tuple[List[tuple[int, int]], List[int]]:
+    """Find the minimum weight matching of a window of players on the graph of each player's k nearest opponents.
+
+    k is doubled while the graph has no perfect matching without rematches. Returns the pairs and the players that
+    stay unmatched on the full graph. With `complete`, rematches of neighbours in points order are allowed, so the
+    matching is always complete.
+    """
+    import networkx as nx
+
+    n = len(window)
+    window_points = points[window]
+    window_cost = cost_matrix[np.ix_(window, window)]
+    window_opponents = opponents[np.ix_(window, window)]
+    order = np.argsort(window_points, kind="stable")
+    while True:
+        k = min(k, n - 1)
+        G = nx.Graph()
+        G.add_nodes_from(range(n))
+        for position in range(n):
+            i = order[position]
+            for j in nearest_opponents(position, order, window_points, window_opponents, k):
+                G.add_edge(i, j, weight=window_cost[i, j])
+        # The neighbours in points order connect the score groups, rematches only to complete the last window
+        for i, j in zip(order[:-1], order[1:]):
+            if not window_opponents[i, j] or (complete and k == n - 1):
+                G.add_edge(i, j, weight=window_cost[i, j])
+        matching = nx.algorithms.matching.min_weight_matching(G, weight="weight")
+        if 2 * len(matching) == n or k == n - 1:
+            matched = {player for pair in matching for player in pair}
+            unmatched = [window[i] for i in order[::-1] if i not in matched]
+            return [(window[i], window[j]) for i, j in matching], unmatched
+        k *= 2
+
+
+def window_ends(order: np.ndarray, points: np.ndarray, size: int) -> List[int]:
+    """End positions of the windows of the points order, of an even size of at least `size`, cut between points."""
+    n = len(order)
+    ends = []
+    start = 0
+    while start < n:
+        end = start + size
+        if n - end < size // 2:
+            end = n
+        else:
+            changes = [p for p in range(end, min(start + 2 * size, n), 2) if points[order[p - 1]] != points[order[p]]]
+            end = changes[0] if changes else end
+        ends.append(end)
+        start = end
+    return ends
+
+
+def sparse_matching(
+    group: List[int], points: np.ndarray, cost_matrix: np.array, opponents: np.ndarray, k: int
+) -> List[tuple[int, int]]:
+    """Match a group of players on the sparse graph of each player's k nearest opponents by points.
+
+    The standings are split into windows of about SPARSE_WINDOW players, cut between score groups, and every window
+    gets the minimum weight matching of its sparse graph. Only players close in points are connected, so the matching
+    never pairs across a large gap in points. Players that can only be paired with a rematch float down to the next
+    window.
+    """
+    if len(group) <= MAX_EXACT_GROUP_SIZE:
+        return match_score_group(group, cost_matrix, MAX_EXACT_GROUP_SIZE)
+
+    order = np.array(group)[np.argsort(-points[group], kind="stable")]
+    matching: List[tuple[int, int]] = []
+    floaters: List[int] = []
+    start = 0
+    ends = window_ends(order, points, SPARSE_WINDOW)
+    for end in ends:
+        window = floaters + list(order[start:end])
+        pairs, floaters = sparse_window_matching(window, points, cost_matrix, opponents, k, end == ends[-1])
+        matching.extend(pairs)
+        start = end
+    return matching
+
+
+def get_pairs_sparse(
+    players: List[Player], cost_matrix: np.array, k: int = SPARSE_NEIGHBOURS
+) -> List[tuple[Player, Player]]:
+    """Get the pairs of players on a sparse graph of each player's k nearest opponents by points.
 
-    # Filter out pairs where a player is paired with itself
-    if first_score <= second_score:
-        pairs = [(players[first_pairing[i]], players[first_pairing[i + 1]]) for i in range(0, len(first_pairing), 2)]
-    else:
-        pairs = [(players[second_pairing[i]], players[second_pairing[i + 1]]) for i in range(0, len(second_pairing), 2)]
+    Falls back to the score group pairing when rematches cannot be avoided.
+    """
+    points = points_vector(players)
+    opponents = create_opponent_matrix(players)
+    matching = sparse_matching(list(range(len(players))), points, cost_matrix, opponents, k)
+    if any(opponents[i, j] for i, j in matching):
+        return get_pairs_score_groups(players, cost_matrix)
+    return [(players[i], players[j]) for i, j in matching]
 
-    return pairs
 
+def greedy_pairs(cost_matrix: np.array) -> tuple[np.ndarray, np.ndarray]:
+    """Pair every player in order with the cheapest unpaired player, preferring the next ones in the order on ties."""
+    n = cost_matrix.shape[0]
+    free = np.ones(n, dtype=bool)
+    first, second = [], []
+    for i in range(n):
+        if not free[i]:
+            continue
+        free[i] = False
+        candidates = np.flatnonzero(free)
+        j = candidates[np.argmin(cost_matrix[i, candidates])]
+        free[j] = False
+        first.append(i)
+        second.append(j)
+    return np.array(first), np.array(second)
+
+
+def improve_pairs(first: np.ndarray, second: np.ndarray, cost_matrix: np.array, deadline: float) -> bool:
+    """Improve pairs in place with 2-opt swaps of two pairs until no swap helps, return False at the deadline.
+
+    Pairs (a, b) and (c, d) are swapped to (a, c), (b, d) or (a, d), (b, c) when that lowers the total cost. The
+    most expensive pairs, rematches first, look for the best swap with all other pairs at once.
+    """
+    improved = True
+    while improved:
+        improved = False
+        for p in np.argsort(-cost_matrix[first, second], kind="stable"):
+            if time.perf_counter() > deadline:
+                return False
+            a, b = first[p], second[p]
+            current = cost_matrix[a, b] + cost_matrix[first, second]
+            swap_ac = cost_matrix[a, first] + cost_matrix[b, second]
+            swap_ad = cost_matrix[a, second] + cost_matrix[b, first]
+            gain = current - np.minimum(swap_ac, swap_ad)
+            gain[p] = 0
+            q = np.argmax(gain)
+            if gain[q] <= 1e-9:
+                continue
+            c, d = first[q], second[q]
+            if swap_ac[q] <= swap_ad[q]:
+                first[p], second[p], first[q], second[q] = a, c, b, d
+            else:
+                first[p], second[p], first[q], second[q] = a, d, b, c
+            improved = True
+    return True
 
-def pairing_by_hand(players: List[Player], row_indices: List[int], col_indices: List[int]):
-    """Pair players by hand if the algorithm fails."""
-    st.write(f"row_indices: {row_indices}")
-    st.write(f"col_indices: {col_indices}")
 
-    st.write("Each list needs to be provided as the following [1, 2, 3, 4]")
+def get_pairs_anytime(
+    players: List[Player], cost_matrix: np.array, time_budget: float = ANYTIME_TIME_BUDGET
+) -> List[tuple[Player, Player]]:
+    """Get the pairs of players within a time budget, greedy pairs in standings order improved by 2-opt swaps."""
+    deadline = time.perf_counter() + time_budget
+    # Standings of the previous round, the same points are ordered by tiebreaker
+    points = points_vector(players)
+    tiebreakers = np.array([player.tiebreaker for player in players], dtype=float)
+    order = np.lexsort((-tiebreakers, -points))
+    ordered_cost = cost_matrix[np.ix_(order, order)]
+
+    first, second = greedy_pairs(ordered_cost)
+    improve_pairs(first, second, ordered_cost, deadline)
+    rematches = int(np.count_nonzero(create_opponent_matrix(players)[order[first], order[second]]))
+    if rematches:
+        emit("warning", f"The pairing has {rematches} rematch(es), the time budget of {time_budget}s ran out.")
+    return [(players[order[i]], players[order[j]]) for i, j in zip(first, second)]
+
+
+def assignment_cycles(row_indices: List[int], col_indices: List[int]) -> List[List[int]]:
+    """Split an assignment into its cycles, every player is followed by the player it is assigned to."""
+    successor = dict(zip(row_indices, col_indices))
+    seen = set()
+    cycles = []
+    for start in row_indices:
+        cycle = []
+        node = start
+        while node not in seen:
+            seen.add(node)
+            cycle.append(node)
+            node = successor[node]
+        if cycle:
+            cycles.append(cycle)
+    return cycles
 
-    solutionlist1 = st.text_input("List 1:")
-    solutionlist2 = st.text_input("List 2:")
 
-    first_score = sum(
-        [
-            abs(players[solutionlist1[i]].points - players[solutionlist1[i + 1]].points)
-            for i in range(0, len(solutionlist1), 2)
-        ]
-    )
-    second_score = sum(
-        [
-            abs(players[solutionlist2[i]].points - players[solutionlist2[i + 1]].points)
-            for i in range(0, len(solutionlist2), 2)
-        ]
-    )
+def get_pairs_sophisticated(players: List[Player], row_indices: List[int], col_indices: List[int]):
+    """Get the pairs of players from the cycles of the assignment found by the Hungarian algorithm.
+
+    Every cycle is split into the half of its edges with the smaller differences in points. An odd cycle leaves out
+    the player whose removal gives the best split, the players left out of all odd cycles are paired in order of
+    points, so the pairing is always complete.
+    """
+    pairs = []
+    left_out = []
+    for cycle in assignment_cycles(list(row_indices), list(col_indices)):
+        odd = len(cycle) % 2
+        best_cost, best_pairs, best_left_out = None, [], None
+        for offset in range(len(cycle) if odd else 2):
+            rotated = cycle[offset:] + cycle[:offset]
+            path = rotated[1:] if odd else rotated
+            cycle_pairs = list(zip(path[0::2], path[1::2]))
+            cost = sum(abs(players[i].points - players[j].points) for i, j in cycle_pairs)
+            if best_cost is None or cost < best_cost:
+                best_cost, best_pairs, best_left_out = cost, cycle_pairs, rotated[0] if odd else None
+        pairs.extend(best_pairs)
+        if best_left_out is not None:
+            left_out.append(best_left_out)
+
+    # An even number of players has an even number of odd cycles
+    left_out.sort(key=lambda i: players[i].points)
+    pairs.extend(zip(left_out[0::2], left_out[1::2]))
+    return [(players[i], players[j]) for i, j in pairs]
+
+
+def create_opponent_matrix(players: List[Player]) -> np.ndarray:
+    """Create the boolean adjacency matrix of players that already played each other."""
+    state = shared_state(players)
+    if state is not None:
+        return state.opponent_matrix(player_ids(players))
+
+    index = {player.name: i for i, player in enumerate(players)}
+    opponents = np.zeros((len(players), len(players)), dtype=bool)
+    for i, player in enumerate(players):
+        played = [index[name] for name in player.previous_opponents if name in index]
+        opponents[i, played] = True
+    return opponents
+
+
+def create_history_matrix(players: List[Player]) -> Optional[np.ndarray]:
+    """Create the boolean adjacency matrix of players that played each other in earlier tournaments, if known."""
+    state = shared_state(players)
+    if state is None:
+        return None
+    ids = player_ids(players)
+    return state.met_before[np.ix_(ids, ids)]
+
+
+def build_cost_matrix(
+    points: np.ndarray,
+    opponents: np.ndarray,
+    ratings: Optional[np.ndarray] = None,
+    met_before: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Build the cost matrix from a points vector and an opponent adjacency matrix in one broadcast.
+
+    Ratings add a secondary cost for pairing players far apart in rating. It is divided over the players, so
+    the rating costs of a whole pairing never outweigh half a point of difference between two players.
+    Players that met in earlier tournaments are paired again only if it saves more than the history cost.
+    A rematch costs more than the largest difference in points, also in long events with large gaps.
+    """
+    points = np.asarray(points, dtype=float)
+    cost_matrix = (points[:, None] - points[None, :]) ** 2
+    largest_gap = cost_matrix.max(initial=0.0)
+    if ratings is not None and len(points):
+        ratings = np.asarray(ratings, dtype=float)
+        spread = np.minimum(((ratings[:, None] - ratings[None, :]) / RATING_SPREAD) ** 2, 1.0)
+        cost_matrix += RATING_COST / len(points) * spread
+    if met_before is not None:
+        cost_matrix += HISTORY_COST * np.asarray(met_before, dtype=bool)
+    cost_matrix += (REMATCH_COST + largest_gap) * np.asarray(opponents, dtype=bool)
+    np.fill_diagonal(cost_matrix, SELF_PAIR_COST + largest_gap)
+    return cost_matrix
 
-    # Filter out pairs where a player is paired with itself
-    if first_score <= second_score:
-        pairs = [(players[solutionlist1[i]], players[solutionlist1[i + 1]]) for i in range(0, len(solutionlist1), 2)]
-    else:
-        pairs = [(players[solutionlist2[i]], players[solutionlist2[i + 1]]) for i in range(0, len(solutionlist2), 2)]
 
-    return pairs
+def create_cost_matrix(players: List[Player]) -> np.array:
+    """Create the cost matrix based on the differences in points and ratings, and the games played before."""
+    return build_cost_matrix(
+        points_vector(players),
+        create_opponent_matrix(players),
+        ratings_vector(players),
+        create_history_matrix(players),
+    )
 
 
-def create_cost_matrix(players: List[Player]) -> np.array:
-    """Create the cost matrix based on the absolute differences in points."""
-    num_players = len(players)
-
-    cost_matrix = np.zeros((num_players, num_players))
-    for i in range(num_players):
-        for j in range(num_players):
-            cost_matrix[i, j] = (players[i].points - players[j].points) ** 2
-            if i == j:
-                cost_matrix[i, j] = 999
-            if players[j].name in players[i].previous_opponents:
-                cost_matrix[i, j] += 100
-    return cost_matrix
+PAIRING_METHODS = {
+    "graph": get_pairs,
+    "score_groups": get_pairs_score_groups,
+    "sparse": get_pairs_sparse,
+    "anytime": get_pairs_anytime,
+}
 
 
-def optimal_pairing(players: List[Player]) -> List[tuple[Player, Player]]:
+def optimal_pairing(players: List[Player], method: str = "graph") -> List[tuple[Player, Player]]:
     """Find the optimal pairing for the rounds of the Swiss Chess tournament."""
     cost_matrix = create_cost_matrix(players)
 
     try:
-        pairs = get_pairs(players, cost_matrix)
+        pairs = PAIRING_METHODS[method](players, cost_matrix)
     except Exception:
+        from scipy.optimize import linear_sum_assignment
+
         # Use the Hungarian algorithm to find the optimal assignment
         row_indices, col_indices = linear_sum_assignment(cost_matrix, maximize=False)
 
-        st.error("!!!!!!!!!!! First pairing method failed, trying second method !!!!!!!!!!!")
+        emit("error", "!!!!!!!!!!! First pairing method failed, trying second method !!!!!!!!!!!")
         try:
             pairs = get_pairs_sophisticated(players, list(row_indices), list(col_indices))
         except Exception as e:
-            st.error("!!!!!!!!!!! Second pairing method failed, trying third method !!!!!!!!!!!")
-            st.error(e)
+            emit("error", "!!!!!!!!!!! Second pairing method failed, trying third method !!!!!!!!!!!")
+            emit("error", str(e))
             try:
-                pairs = get_pairs_simple(players, row_indices, col_indices)
+                pairs = get_pairs_anytime(players, cost_matrix)
             except Exception as e2:
-                st.error(e2)
-                st.error("!!!!!!!!!!! Third pairing method failed, provide pairing by hand !!!!!!!!!!!")
-                pairs = pairing_by_hand(players, row_indices, col_indices)
+                emit("error", str(e2))
+                raise PairingError(players, row_indices, col_indices) from e2
 
     return pairs
 
 
-def pairing(all_players: List[Player]) -> List[tuple[Player, Player]]:
+def pairing(all_players: List[Player], method: str = "graph") -> List[tuple[Player, Player]]:
     """Pair the players based on the Swiss Chess tournament rules."""
     sorted_players = sorted(all_players, key=lambda x: x.points, reverse=False)
 
@@ -221,6 +450,6 @@ def pairing(all_players: List[Player]) -> List[tuple[Player, Player]]:
         sorted_players = take_odd_player_out(sorted_players)
 
     # Find the optimal pairing for the remaining players
-    pairs = optimal_pairing(sorted_players)
+    pairs = optimal_pairing(sorted_players, method)
 
     return pairs
@@ -1,38 +1,69 @@
 """Player class for the Swiss Chess Tournament."""
-from typing import List
+from typing import List, Optional
 
-import matplotlib.image as mpimg
+import numpy as np
+
+from swiss_chess.utils.images import player_image
+from swiss_chess.utils.state import TournamentState
+
+
+class StateField:
+    """Attribute of a player that is stored in an array of the tournament state."""
+
+    def __set_name__(self, owner, name: str):
+        """Store the name of the state array."""
+        self.field = name
+
+    def __get__(self, player, owner=None):
+        """Get the value of the player from the state array."""
+        if player is None:
+            return self
+        return getattr(player.state, self.field)[player.id].item()
+
+    def __set__(self, player, value):
+        """Set the value of the player in the state array."""
+        getattr(player.state, self.field)[player.id] = value
 
 
 class Player:
-    """Player class for the Swiss Chess Tournament."""
+    """Player class for the Swiss Chess Tournament, a thin view over the tournament state."""
+
+    points = StateField()
+    tiebreaker = StateField()
+    no_game_found = StateField()
+    previous_white = StateField()
+    previous_black = StateField()
+    games_played = StateField()
+    rating = StateField()
 
-    def __init__(self, player: str):
+    def __init__(self, player: str, state: Optional[TournamentState] = None):
         """Initialize the player object."""
         self.name = player
-        self.points = 0.0
-        self.no_game_found = 0
-        self.previous_opponents: List[str] = []
-        self.game_result: List[float] = []
-        self.previous_white = 0
-        self.previous_black = 0
+        self.state = state if state is not None else TournamentState(capacity=1)
+        self.id = self.state.add_player(player)
         self.win_percentage = 0
-        self.tiebreaker = 0.0
-        self.games_played = 0
         self.won_semi_final = False
         self.lost_semi_final = False
         self.won_loser_final = False
         self.lost_loser_final = False
         self.won_final = False
         self.lost_final = False
-        self.add_player_image(player)
+        self.battle_score = 0
+
+    @property
+    def img(self) -> np.ndarray:
+        """Image of the player, loaded from the shared image store when it is first rendered."""
+        return player_image(self.name)
+
+    @property
+    def previous_opponents(self) -> List[str]:
+        """Names of the opponents the player played against."""
+        return self.state.opponent_names[self.id]
 
-    def add_player_image(self, player: str):
-        """Add player image to the player object."""
-        try:
-            self.img = mpimg.imread(f"data/images/{player}.png")
-        except Exception:
-            self.img = mpimg.imread("data/images/pikapolice.jpg")
+    @property
+    def game_result(self) -> List[float]:
+        """Results of the games the player played."""
+        return self.state.game_results[self.id]
 
     def add_point(self):
         """Add a point to the player (due to winning a game)."""
@@ -48,7 +79,7 @@ class Player:
 
     def add_opponent(self, opponent):
         """Add a played opponent to the player."""
-        self.previous_opponents.append(opponent)
+        self.state.add_opponent(self.id, opponent)
 
     def add_color(self, color: str):
         """Add the color the player played with to the player."""
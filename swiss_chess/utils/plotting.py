@@ -1,41 +1,66 @@
 """Create plots for the Swiss Chess Tournament."""
 import random
-from typing import List
+from typing import TYPE_CHECKING, List
 
-import matplotlib.image as mpimg
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
-from matplotlib.offsetbox import AnnotationBbox, OffsetImage
-from skimage import transform
 
+from swiss_chess.utils.figures import figure_cache, figure_key
+from swiss_chess.utils.images import image_path, pawn_path, scaled_image
 from swiss_chess.utils.player import Player
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from matplotlib.figure import Figure
 
-def show_standings(all_players: List[Player], col2: st.delta_generator.DeltaGenerator):
-    """Show the standings of the Swiss Chess Tournament."""
+STANDINGS_PAGE_SIZE = 50
+
+
+def standings_table(all_players: List[Player], tiebreaker: str = "Opponent points") -> "pd.DataFrame":
+    """Create the standings table of the Swiss Chess Tournament."""
+    import pandas as pd
+
+    sorted_players = sorted(all_players, key=lambda x: (x.points, x.tiebreaker, x.battle_score), reverse=True)
+    return pd.DataFrame(
+        {
+            "Rank": np.arange(1, len(sorted_players) + 1),
+            "Player": [player.name for player in sorted_players],
+            "Points": np.round([player.points for player in sorted_players], 1),
+            tiebreaker: np.round([player.tiebreaker for player in sorted_players], 1),
+        }
+    )
+
+
+def show_standings(
+    all_players: List[Player],
+    col2: st.delta_generator.DeltaGenerator,
+    tiebreaker: str = "Opponent points",
+    key: str = "standings",
+):
+    """Show the standings of the Swiss Chess Tournament as one table, in pages for large fields."""
     col2.write("# Standings")
-    sorted_players = sorted(all_players, key=lambda x: (x.points, x.tiebreaker), reverse=True)
-    for player in sorted_players:
-        col2.write(
-            f"""**{player.name}**: {np.round(player.points, 1)} points
-            <span style='color:grey'>({np.round(player.tiebreaker, 1)})</span>""",
-            unsafe_allow_html=True,
-        )
+    col2.caption(f"Tiebreaker: {tiebreaker}")
+    table = standings_table(all_players, tiebreaker)
+    pages = -(-len(table) // STANDINGS_PAGE_SIZE)
+    if pages > 1:
+        page = col2.number_input("Page", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+        table = table.iloc[(page - 1) * STANDINGS_PAGE_SIZE : page * STANDINGS_PAGE_SIZE]
+    col2.dataframe(table, hide_index=True)
 
 
 def create_image_score(player, loc_x_text, loc_y_text, loc_x_pic, loc_y_pic, zoom, outline, ax, final=True, pawn=False):
     """Create image with score and name."""
+    from matplotlib.offsetbox import AnnotationBbox, OffsetImage
+
     if final:
         ax.text(loc_x_text, loc_y_text, f"{player.name}", size=11, ha=outline, va="center")
     if pawn:
-        img = mpimg.imread(f"data/images/{player}_pawn.png")
+        path = pawn_path(player)
     else:
-        img = player.img
+        path = image_path(player.name)
 
-    # Improve image quality by using anti-aliasing
-    scale = (100 / img.shape[0]) * zoom
-    img = transform.rescale(img, scale, channel_axis=2, anti_aliasing=True)
+    # Rescaled with anti-aliasing once, then reused by every figure
+    img = scaled_image(path, zoom)
 
     imagebox = OffsetImage(img, zoom=1)
     ab = AnnotationBbox(imagebox, (loc_x_pic, loc_y_pic), frameon=False, box_alignment=(0.5, 0.0))
@@ -55,18 +80,22 @@ def create_random_color(iteration: int):
     return random_color1, random_color2
 
 
-def show_matchup(sorted_players: List[Player], is_final: bool = False, third_place_match: bool = False):
-    """Show the matchup for the semi-finals or finals."""
+def draw_matchup(
+    sorted_players: List[Player],
+    random_color1: List[str],
+    random_color2: List[str],
+    is_final: bool = False,
+    third_place_match: bool = False,
+) -> "Figure":
+    """Draw the matchup for the semi-finals or finals."""
+    from matplotlib.figure import Figure
+
     if is_final and not third_place_match:
-        fig = plt.figure(figsize=(7, 1))
+        fig = Figure(figsize=(7, 1))
     else:
-        fig = plt.figure(figsize=(7, 4))
+        fig = Figure(figsize=(7, 4))
 
     ax = fig.add_subplot(111)
-    if is_final:
-        random_color1, random_color2 = create_random_color(1)
-    else:
-        random_color1, random_color2 = create_random_color(2)
 
     # Text
     if is_final:
@@ -121,5 +150,26 @@ def show_matchup(sorted_players: List[Player], is_final: bool = False, third_pla
         ax.set_ylim([3, 7])
     else:
         ax.set_ylim([-3, 7])
-    plt.axis("off")
-    st.pyplot(fig)
+    ax.axis("off")
+    return fig
+
+
+def show_matchup(sorted_players: List[Player], is_final: bool = False, third_place_match: bool = False):
+    """Show the matchup for the semi-finals or finals, rendered again only when the players or colours change."""
+    if is_final:
+        random_color1, random_color2 = create_random_color(1)
+    else:
+        random_color1, random_color2 = create_random_color(2)
+
+    key = figure_key(
+        "matchup",
+        [(player.name, image_path(player.name)) for player in sorted_players[:4]],
+        random_color1,
+        random_color2,
+        is_final,
+        third_place_match,
+    )
+    png = figure_cache.get(
+        key, lambda: draw_matchup(sorted_players, random_color1, random_color2, is_final, third_place_match)
+    )
+    st.image(png)
@@ -1,11 +1,14 @@
 """Create plots for the Swiss Chess Tournament."""
-from typing import List
-
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING, List
 
+from swiss_chess.utils.figures import figure_cache, figure_key
+from swiss_chess.utils.images import image_path
 from swiss_chess.utils.player import Player
 from swiss_chess.utils.plotting import create_image_score
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 
 def player_won_final(all_players: List[Player]):
     """Return the player that won the final."""
@@ -71,7 +74,7 @@ def sort_players(all_players: List[Player], finals_mode: bool):
         ]
         return sorted_players + add_other_players(all_players)
     else:
-        return sorted(all_players, key=lambda x: (x.points, x.tiebreaker), reverse=True)
+        return sorted(all_players, key=lambda x: (x.points, x.tiebreaker, x.battle_score), reverse=True)
 
 
 def add_additional_players(ax, sorted_players: List[Player], third_place_match):
@@ -129,11 +132,13 @@ def add_players_to_podium(ax, sorted_players: List[Player], third_place_match):
         ax = create_image_score(sorted_players[2], 6, 0.8, 6, 1.01, 1, "center", ax)
 
 
-def create_podium(all_players: List[Player], third_place_match: bool = False, finals_mode: bool = True):
+def create_podium(all_players: List[Player], third_place_match: bool = False, finals_mode: bool = True) -> "Figure":
     """Create the podium for the Swiss Chess Tournament."""
+    from matplotlib.figure import Figure
+
     sorted_players = sort_players(all_players, finals_mode)
 
-    fig = plt.figure(figsize=(11, 4.5))
+    fig = Figure(figsize=(11, 4.5))
     ax = fig.add_subplot(111)
 
     # Create podium
@@ -147,5 +152,12 @@ def create_podium(all_players: List[Player], third_place_match: bool = False, fi
 
     ax.set_xlim([-10, 13])
     ax.set_ylim([-0.1, 3.5])
-    plt.axis("off")
+    ax.axis("off")
     return fig
+
+
+def podium_png(all_players: List[Player], third_place_match: bool = False, finals_mode: bool = True) -> bytes:
+    """Render the podium, reusing the last rendering as long as the order and images of the players are unchanged."""
+    sorted_players = sort_players(all_players, finals_mode)
+    key = figure_key("podium", [(player.name, image_path(player.name)) for player in sorted_players], third_place_match)
+    return figure_cache.get(key, lambda: create_podium(all_players, third_place_match, finals_mode))
@@ -0,0 +1,115 @@
+"""Background prefetching of online chess puzzles, so a puzzle battle starts without waiting on the API."""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from swiss_chess.utils.utils import API_TIMEOUT, API_URL, chess_puzzle_api
+
+logger = logging.getLogger("swiss_chess")
+
+BATCH_SIZE = 5
+LOW_WATER = 2
+# Seconds without refills of a queue after its refill failed
+FAILURE_BACKOFF = 60.0
+
+
+class PuzzlePrefetcher:
+    """Queues of puzzles per (rating, moves), refilled in batches in the background over one HTTP session.
+
+    A queue whose refill failed is not refilled in the background for `backoff` seconds.
+    """
+
+    def __init__(
+        self,
+        url: str = API_URL,
+        batch_size: int = BATCH_SIZE,
+        low_water: int = LOW_WATER,
+        timeout: float = API_TIMEOUT,
+        workers: int = 2,
+        backoff: float = FAILURE_BACKOFF,
+    ):
+        """Initialize the prefetcher with empty queues."""
+        import requests  # type: ignore
+
+        self.url = url
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.timeout = timeout
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="puzzle-prefetch")
+        self.queues: Dict[tuple[int, int], List[Dict]] = {}
+        self.pending: Dict[tuple[int, int], Future] = {}
+        self.failures: Dict[tuple[int, int], float] = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, rating: int, moves: int) -> List[Dict]:
+        """Fetch a batch of puzzles."""
+        return chess_puzzle_api(
+            rating, moves, count=self.batch_size, session=self.session, url=self.url, timeout=self.timeout
+        )
+
+    def fill(self, rating: int, moves: int):
+        """Fetch a batch of puzzles and add it to the queue."""
+        try:
+            puzzles = self.fetch(rating, moves)
+        except Exception as error:
+            # Without network every queue fails, one line each is enough
+            logger.warning("Prefetching puzzles with rating %s and %s moves failed: %s", rating, moves, error)
+            with self.lock:
+                self.failures[(rating, moves)] = time.monotonic()
+            return
+        with self.lock:
+            self.failures.pop((rating, moves), None)
+            self.queues.setdefault((rating, moves), []).extend(puzzles)
+
+    def prefetch(self, rating: int, moves: int) -> Optional[Future]:
+        """Refill the queue in the background when it runs low, unless a refill is running or failed recently."""
+        key = (rating, moves)
+        with self.lock:
+            if len(self.queues.get(key, [])) > self.low_water:
+                return None
+            if key in self.failures and time.monotonic() - self.failures[key] < self.backoff:
+                return None
+            if key in self.pending and not self.pending[key].done():
+                return self.pending[key]
+            future = self.executor.submit(self.fill, rating, moves)
+            self.pending[key] = future
+            return future
+
+    def prefetch_all(self, ratings: Iterable[int], moves: Iterable[int]):
+        """Start filling the queues of all combinations of ratings and moves."""
+        for rating in ratings:
+            for n_moves in moves:
+                self.prefetch(rating, n_moves)
+
+    def get(self, rating: int, moves: int) -> Dict:
+        """Take a puzzle from the queue, waiting for a running refill or fetching one directly if it is empty."""
+        key = (rating, moves)
+        with self.lock:
+            pending = self.pending.get(key)
+            empty = not self.queues.get(key)
+        if empty and pending is not None:
+            pending.result()
+        with self.lock:
+            queue = self.queues.get(key)
+            puzzle = queue.pop(0) if queue else None
+        if puzzle is None:
+            # Raise the error of the API when prefetching failed
+            puzzle = chess_puzzle_api(rating, moves, session=self.session, url=self.url, timeout=self.timeout)[0]
+        self.prefetch(rating, moves)
+        return puzzle
+
+    def close(self):
+        """Stop the background fetches and close the HTTP session."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
+
+@lru_cache(maxsize=None)
+def puzzle_prefetcher(url: str = API_URL) -> PuzzlePrefetcher:
+    """Prefetcher shared by all sessions of the process."""
+    return PuzzlePrefetcher(url)
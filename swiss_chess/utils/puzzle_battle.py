@@ -1,21 +1,94 @@
 """The puzzle battle for the swiss chess tournament."""
-import time
-from typing import List
+import base64
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
 
-import chess
-import chess.svg
-import numpy as np
 import streamlit as st
 
 from swiss_chess.utils.player import Player
-from swiss_chess.utils.utils import chess_puzzle_api
+from swiss_chess.utils.prefetch import puzzle_prefetcher
+from swiss_chess.utils.puzzles import open_puzzle_store
+from swiss_chess.utils.tournament import Tournament
+from swiss_chess.utils.utils import API_KEY_VARIABLE
+
+PUZZLE_RATINGS = [1000, 1500, 2000, 2500, 3000]
+PUZZLE_MOVES = [1, 2, 3, 4]
+BOARD_SIZE = 700
+FRAME_SECONDS = 1
+
+
+def prefetch_puzzles(tournament: Tournament):
+    """Start fetching online puzzles in the background when the top of the standings is tied.
+
+    Nothing is fetched with an offline store or without a key of the chess-puzzles API.
+    """
+    if not tournament.tie_groups() or not os.environ.get(API_KEY_VARIABLE) or open_puzzle_store() is not None:
+        return
+    puzzle_prefetcher().prefetch_all(PUZZLE_RATINGS, PUZZLE_MOVES)
+
+
+def get_puzzle(rating: int, moves: int, iteration: int) -> Dict:
+    """Get a puzzle from the offline puzzle store, or from the chess-puzzles API if the store has none."""
+    puzzle_key = f"puzzle_data_{iteration}_{rating}_{moves}"
+    if puzzle_key not in st.session_state:
+        store = open_puzzle_store()
+        puzzle = store.random_puzzle(rating, moves) if store is not None else None
+        if puzzle is None:
+            try:
+                puzzle = puzzle_prefetcher().get(rating, moves)
+            except RuntimeError as error:
+                # No offline store and no API key
+                st.error(str(error))
+                st.stop()
+        # Keep the puzzle on reruns
+        st.session_state[puzzle_key] = puzzle
+    return st.session_state[puzzle_key]
+
+
+@lru_cache(maxsize=4096)
+def board_svg(fen: str, lastmove: Optional[str] = None) -> str:
+    """Render a position, with the last move highlighted."""
+    # python-chess is imported on first use, most tournaments never get to a puzzle battle
+    import chess
+    import chess.svg
+
+    return chess.svg.board(
+        chess.Board(fen), lastmove=chess.Move.from_uci(lastmove) if lastmove else None, size=BOARD_SIZE
+    )
+
+
+@lru_cache(maxsize=256)
+def solution_frames(fen: str, moves: tuple[str, ...]) -> tuple[str, ...]:
+    """Render the position after every move of a puzzle, the first move is the one of the opponent."""
+    import chess
+
+    board = chess.Board(fen)
+    frames = []
+    for move in moves:
+        board.push_uci(move)
+        frames.append(board_svg(board.fen(), move))
+    return tuple(frames)
+
+
+@lru_cache(maxsize=256)
+def solution_player(fen: str, moves: tuple[str, ...]) -> str:
+    """HTML that plays the solution of a puzzle in the browser with CSS animations, one move per frame."""
+    frames = "".join(
+        f"""<img src="data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"
+        style="position:absolute;top:0;left:0;width:100%;opacity:0;
+        animation:puzzle-frame 1ms {i * FRAME_SECONDS}s forwards">"""
+        for i, svg in enumerate(solution_frames(fen, moves))
+    )
+    return f"""<style>@keyframes puzzle-frame {{ to {{ opacity: 1; }} }}</style>
+<div style="position:relative;width:100%;max-width:{BOARD_SIZE}px;aspect-ratio:1">{frames}</div>"""
 
 
 def create_chess_puzzle(rating: int, moves: int, iteration: int):
     """Create the chess puzzle."""
-    response = chess_puzzle_api(rating, moves, iteration)
-    fen = response.json()["puzzles"][0]["fen"]
-    all_moves = response.json()["puzzles"][0]["moves"]
+    puzzle = get_puzzle(rating, moves, iteration)
+    fen = puzzle["fen"]
+    all_moves = tuple(puzzle["moves"])
 
     split_respnse = fen.split(" ")
     if split_respnse[1] == "b":
@@ -25,11 +98,6 @@ def create_chess_puzzle(rating: int, moves: int, iteration: int):
     col1, col2 = st.columns([3, 2])
     col1.title(f"{color} to move with {moves} move(s).")
     image_placeholder = st.empty()
-    board = chess.Board(fen)
-    svg = chess.svg.board(board, size=700)
-    board.push(chess.Move.from_uci(all_moves[0]))
-    svg = chess.svg.board(board, lastmove=chess.Move.from_uci(all_moves[0]), size=700)
-    image_placeholder.image(svg, output_format="SVG")
 
     submit_key = f"puzzle_{iteration}"
     if submit_key not in st.session_state:
@@ -39,22 +107,30 @@ def create_chess_puzzle(rating: int, moves: int, iteration: int):
         st.session_state[submit_key] = True
 
     if st.session_state[submit_key]:
-        for move in all_moves[1:]:
-            board.push(chess.Move.from_uci(move))
-            svg = chess.svg.board(board, lastmove=chess.Move.from_uci(move), size=700)
-            image_placeholder.image(svg, output_format="SVG")
-            time.sleep(1)
+        # The frames are rendered once per puzzle and played back by the browser
+        image_placeholder.html(solution_player(fen, all_moves))
         st.session_state[submit_key] = False
+    else:
+        image_placeholder.image(solution_frames(fen, all_moves)[0], output_format="SVG")
 
 
-def puzzle_battle(player1: Player, player2: Player, cnt: int):
+def restore_puzzle_battles(puzzle_battles: Dict[str, Dict]):
+    """Restore the choices and the outcomes of the puzzle battles from the event log record."""
+    for battle in puzzle_battles.values():
+        cnt, player1, player2 = battle["battle"], battle["player1"], battle["player2"]
+        st.session_state[f"rating_{cnt}"] = battle["rating"]
+        st.session_state[f"moves_{cnt}"] = battle["moves"]
+        st.session_state[f"puzzle_choice_{player1}_{player2}_{cnt}"] = True
+        st.session_state[f"puzzle_battle_{cnt}"] = battle["winner"]
+        st.session_state[f"puzzle_{player1}_{player2}_{cnt}"] = True
+
+
+def puzzle_battle(player1: Player, player2: Player, cnt: int) -> Player:
     """Determine the winner of the puzzle battle."""
     st.write("Because of a tie in the final standings there will be a puzzle battle!")
     st.write(f"The battle will be between {player1.name} and {player2.name}.")
-    rating = st.selectbox(
-        "Select the rating for the puzzle battle:", [1000, 1500, 2000, 2500, 3000], key=f"rating_{cnt}"
-    )
-    moves = st.selectbox("Select the number of moves for the puzzle battle:", [1, 2, 3, 4], key=f"moves_{cnt}")
+    rating = st.selectbox("Select the rating for the puzzle battle:", PUZZLE_RATINGS, key=f"rating_{cnt}")
+    moves = st.selectbox("Select the number of moves for the puzzle battle:", PUZZLE_MOVES, key=f"moves_{cnt}")
 
     submit_key = f"puzzle_choice_{player1.name}_{player2.name}_{cnt}"
     if submit_key not in st.session_state:
@@ -85,44 +161,16 @@ def puzzle_battle(player1: Player, player2: Player, cnt: int):
     if not st.session_state[submit_key]:
         st.stop()
 
+    event_log = st.session_state.get("event_log")
+    if event_log is not None:
+        event_log.log_puzzle_battle(cnt, player1.name, player2.name, rating, moves, winner)
+
     if winner == player1.name:
-        player1.tiebreaker = np.round(player1.tiebreaker + 0.1, 1)
-    else:
-        player2.tiebreaker = np.round(player2.tiebreaker + 0.1, 1)
-    return None
+        return player1
+    return player2
 
 
-def determine_rounds_standings(all_players: List[Player], tiebreaker):
-    """Create the puzzle battle."""
-    if tiebreaker == "Opponent points":
-        sorted_players = sorted(all_players, key=lambda x: (x.points, x.tiebreaker), reverse=True)
-        all_points = [(player.points, player.tiebreaker) for player in sorted_players]
-    else:
-        sorted_players = sorted(all_players, key=lambda x: x.points, reverse=True)
-        all_points = [(player.points, 0) for player in sorted_players]
-
-    max_standings = min(3, len(all_points) - 1)
-    all_points2 = [point for point in all_points if point >= all_points[max_standings]]
-    top_players = sorted_players[: len(all_points2)]
-    cnt = 0
-    while len(all_points2) != len(set(all_points2)):
-        for i, player in enumerate(top_players):
-            for j, player2 in enumerate(top_players):
-                if (
-                    (i != j)
-                    and (player.points == player2.points)
-                    and (tiebreaker != "Opponent points" or player.tiebreaker == player2.tiebreaker)
-                ):
-                    cnt += 1
-                    puzzle_battle(player, player2, cnt)
-                    if tiebreaker == "Opponent points":
-                        all_points2 = [(player.points, player.tiebreaker) for player in top_players]
-                    else:
-                        all_points2 = [(player.points, 0) for player in top_players]
-                    break
-
-    if tiebreaker == "Opponent points":
-        sorted_players = sorted(all_players, key=lambda x: (x.points, x.tiebreaker), reverse=True)
-    else:
-        sorted_players = sorted(all_players, key=lambda x: x.points, reverse=True)
-    return sorted_players
+def determine_rounds_standings(tournament: Tournament) -> List[Player]:
+    """Create the puzzle battles for the ties in the top of the standings."""
+    prefetch_puzzles(tournament)
+    return tournament.resolve_ties(puzzle_battle)
@@ -0,0 +1,141 @@
+"""Offline chess puzzle store, built from the Lichess puzzle database and indexed by solution length and rating.
+
+Build the store once from the uncompressed CSV of https://database.lichess.org/#puzzles:
+
+    python -m swiss_chess.utils.puzzles lichess_db_puzzle.csv --output data/puzzles
+
+The store is a directory of memory-mapped arrays, so opening it does not read the puzzles into memory:
+
+- text.bin: the FEN and the moves of every puzzle, one line per puzzle
+- offsets.npy: start of every line in text.bin, plus the end of the last one
+- ratings.npy: rating of every puzzle
+- order.npy: puzzle numbers sorted by number of player moves and rating bucket
+- starts.npy: starts[moves, bucket] is the first position in order.npy of that moves and bucket
+"""
+import argparse
+import csv
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+PUZZLE_DIR = "data/puzzles"
+RATING_BUCKET = 100
+FORMAT_VERSION = 1
+
+
+def read_lichess_csv(path: str) -> Iterator[tuple[str, str, int]]:
+    """Iterate over the FEN, moves and rating of the puzzles in a Lichess puzzle CSV."""
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if not row or row[0] == "PuzzleId":
+                continue
+            yield row[1], row[2], int(row[3])
+
+
+def player_moves(moves: str) -> int:
+    """Number of moves the solver plays, the first move of a Lichess puzzle is the opponent's."""
+    return len(moves.split()) // 2
+
+
+def build_puzzle_store(csv_path: str, output: str = PUZZLE_DIR, bucket_size: int = RATING_BUCKET) -> int:
+    """Convert a Lichess puzzle CSV into an indexed puzzle store and return the number of puzzles."""
+    os.makedirs(output, exist_ok=True)
+    offsets = [0]
+    ratings = []
+    n_moves = []
+    with open(os.path.join(output, "text.bin"), "wb") as text:
+        for fen, moves, rating in read_lichess_csv(csv_path):
+            line = f"{fen},{moves}\n".encode()
+            text.write(line)
+            offsets.append(offsets[-1] + len(line))
+            ratings.append(rating)
+            n_moves.append(player_moves(moves))
+
+    ratings_array = np.array(ratings, dtype=np.int16)
+    moves_array = np.array(n_moves, dtype=np.int16)
+    n_buckets = int(ratings_array.max(initial=0)) // bucket_size + 1
+    keys = moves_array.astype(np.int64) * n_buckets + ratings_array // bucket_size
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    # One row per number of moves, with one extra column for the end of the last bucket
+    grid = np.arange(int(moves_array.max(initial=0)) + 1)[:, None] * n_buckets + np.arange(n_buckets + 1)[None, :]
+    starts = np.searchsorted(keys[order], grid)
+
+    np.save(os.path.join(output, "offsets.npy"), np.array(offsets, dtype=np.int64))
+    np.save(os.path.join(output, "ratings.npy"), ratings_array)
+    np.save(os.path.join(output, "order.npy"), order)
+    np.save(os.path.join(output, "starts.npy"), starts)
+    with open(os.path.join(output, "meta.json"), "w", encoding="utf-8") as file:
+        json.dump({"version": FORMAT_VERSION, "bucket_size": bucket_size, "count": len(ratings)}, file)
+    return len(ratings)
+
+
+class PuzzleStore:
+    """Memory-mapped puzzle store with random puzzles by rating and number of moves in O(1)."""
+
+    def __init__(self, path: str = PUZZLE_DIR):
+        """Open the puzzle store."""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Puzzle store {path} has version {meta['version']}, expected {FORMAT_VERSION}.")
+        self.bucket_size = meta["bucket_size"]
+        self.text = np.memmap(os.path.join(path, "text.bin"), dtype=np.uint8, mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.ratings = np.load(os.path.join(path, "ratings.npy"), mmap_mode="r")
+        self.order = np.load(os.path.join(path, "order.npy"), mmap_mode="r")
+        self.starts = np.load(os.path.join(path, "starts.npy"))
+
+    def __len__(self) -> int:
+        """Number of puzzles in the store."""
+        return len(self.ratings)
+
+    def candidates(self, rating: int, moves: int, deviation: int = 100) -> tuple[int, int]:
+        """Range in the order array of the puzzles with the number of moves and a rating bucket within deviation."""
+        if not 0 <= moves < self.starts.shape[0]:
+            return 0, 0
+        n_buckets = self.starts.shape[1] - 1
+        lowest = min(max((rating - deviation) // self.bucket_size, 0), n_buckets)
+        highest = min(max((rating + deviation) // self.bucket_size + 1, 0), n_buckets)
+        return int(self.starts[moves, lowest]), int(self.starts[moves, highest])
+
+    def puzzle(self, number: int) -> Dict:
+        """Get a puzzle by its number, in the format of the chess-puzzles API."""
+        line = self.text[self.offsets[number] : self.offsets[number + 1] - 1].tobytes().decode()
+        fen, moves = line.split(",")
+        return {"fen": fen, "moves": moves.split(), "rating": int(self.ratings[number])}
+
+    def random_puzzle(
+        self, rating: int, moves: int, deviation: int = 100, rng: Optional[np.random.Generator] = None
+    ) -> Optional[Dict]:
+        """Pick a random puzzle with the number of moves around the rating, or None if there is none."""
+        start, end = self.candidates(rating, moves, deviation)
+        if start == end:
+            return None
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.puzzle(int(self.order[rng.integers(start, end)]))
+
+
+@lru_cache(maxsize=None)
+def open_puzzle_store(path: str = PUZZLE_DIR) -> Optional[PuzzleStore]:
+    """Open the puzzle store once per process, or return None if it is not built."""
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    return PuzzleStore(path)
+
+
+def main():
+    """Build the puzzle store from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="Uncompressed Lichess puzzle CSV.")
+    parser.add_argument("--output", default=PUZZLE_DIR)
+    parser.add_argument("--bucket-size", type=int, default=RATING_BUCKET)
+    args = parser.parse_args()
+    count = build_puzzle_store(args.csv, args.output, args.bucket_size)
+    print(f"Stored {count} puzzles in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Elo ratings of the players, kept across tournaments and updated in one batch after every round."""
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+
+RATINGS_PATH = "data/ratings.json"
+INITIAL_RATING = 1500.0
+# FIDE style development coefficients, higher for players with few rated games
+K_NEW = 40.0
+K_ESTABLISHED = 20.0
+ESTABLISHED_GAMES = 30
+
+
+def expected_score(ratings: np.ndarray, opponent_ratings: np.ndarray) -> np.ndarray:
+    """Expected score of players against their opponents."""
+    return 1 / (1 + 10 ** ((opponent_ratings - ratings) / 400))
+
+
+def game_scores(pairs: Sequence[tuple[str, str]], winners: Sequence[str]) -> np.ndarray:
+    """Score of the first player of every pair, from the winner or 'draw'."""
+    return np.array(
+        [
+            1.0 if winner == first else 0.0 if winner == second else 0.5
+            for (first, second), winner in zip(pairs, winners)
+        ]
+    )
+
+
+def rated_round_key(tournament_id: str, round_number: int) -> str:
+    """Key of a rated round, every round of a tournament is rated once."""
+    return f"{tournament_id}:{round_number}"
+
+
+class RatingStore:
+    """Elo ratings and number of rated games per player name, and the keys of the rated rounds, in a JSON file."""
+
+    def __init__(self, path: str = RATINGS_PATH):
+        """Load the ratings, or start without players if the file does not exist."""
+        self.path = path
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.ratings = np.zeros(0)
+        self.games = np.zeros(0, dtype=np.int64)
+        self.applied: Set[str] = set()
+        # Sessions of the Streamlit app share the store
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            players = data["players"]
+            self.applied = set(data.get("applied", []))
+            self.names = list(players)
+            self.index = {name: i for i, name in enumerate(self.names)}
+            self.ratings = np.array([player["rating"] for player in players.values()], dtype=float)
+            self.games = np.array([player["games"] for player in players.values()], dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Number of rated players."""
+        return len(self.names)
+
+    def ratings_of(self, names: Sequence[str]) -> np.ndarray:
+        """Ratings of the players, the initial rating for unknown players."""
+        with self.lock:
+            return np.array(
+                [self.ratings[self.index[name]] if name in self.index else INITIAL_RATING for name in names]
+            )
+
+    def player_ids(self, names: Sequence[str]) -> np.ndarray:
+        """IDs of the players, adding unknown players with the initial rating."""
+        new_names = [name for name in dict.fromkeys(names) if name not in self.index]
+        for name in new_names:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        self.ratings = np.concatenate([self.ratings, np.full(len(new_names), INITIAL_RATING)])
+        self.games = np.concatenate([self.games, np.zeros(len(new_names), dtype=np.int64)])
+        return np.array([self.index[name] for name in names], dtype=np.intp)
+
+    def update(self, pairs: Sequence[tuple[str, str]], scores: np.ndarray, key: str) -> bool:
+        """Rate the games of one round at once, `scores` are the scores of the first player of every pair.
+
+        All games are rated against the ratings before the round, in O(games) with no replay of earlier rounds.
+        A round with a key that was rated before is not rated again, returns whether the round was rated.
+        """
+        if not len(pairs):
+            return False
+        with self.lock:
+            if key in self.applied:
+                return False
+            first = self.player_ids([pair[0] for pair in pairs])
+            second = self.player_ids([pair[1] for pair in pairs])
+            expected = expected_score(self.ratings[first], self.ratings[second])
+            k_first = np.where(self.games[first] < ESTABLISHED_GAMES, K_NEW, K_ESTABLISHED)
+            k_second = np.where(self.games[second] < ESTABLISHED_GAMES, K_NEW, K_ESTABLISHED)
+            np.add.at(self.ratings, first, k_first * (scores - expected))
+            np.add.at(self.ratings, second, k_second * (expected - scores))
+            np.add.at(self.games, first, 1)
+            np.add.at(self.games, second, 1)
+            self.applied.add(key)
+            self.save()
+        return True
+
+    def save(self):
+        """Write the ratings, replacing the previous file atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        players = {
+            name: {"rating": round(float(rating), 2), "games": int(games)}
+            for name, rating, games in zip(self.names, self.ratings, self.games)
+        }
+        # A unique temporary file in the same directory, so the replace is atomic and concurrent writers do not mix
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory or ".", prefix=".ratings-", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump({"players": players, "applied": sorted(self.applied)}, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+@lru_cache(maxsize=None)
+def open_rating_store(path: str = RATINGS_PATH) -> RatingStore:
+    """Open the rating store once per process."""
+    return RatingStore(path)
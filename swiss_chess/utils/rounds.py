@@ -1,54 +1,131 @@
 """Determines the winner of the game and gives the player a point based on the winner."""
 import base64
+import hashlib
 import io
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import streamlit as st
-from PIL import Image
 
+from swiss_chess.utils.history import open_history
+from swiss_chess.utils.images import pawn_path
+from swiss_chess.utils.pairing import PairingError
 from swiss_chess.utils.player import Player
+from swiss_chess.utils.ratings import game_scores, open_rating_store, rated_round_key
+from swiss_chess.utils.tournament import Tournament
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def find_best_color(player1: Player, player2: Player):
-    """Find the best color for each player based on the previous games."""
-    player1_ratio = player1.previous_white - player1.previous_black
-    player2_ratio = player2.previous_white - player2.previous_black
-    if player1_ratio > player2_ratio:
-        color1 = "black"
-        color2 = "white"
-    else:
-        color1 = "white"
-        color2 = "black"
-    player1.add_color(color1)
-    player2.add_color(color2)
-    return color1, color2
 
+class RoundRecord:
+    """Frozen pairing of a round, replayed on reruns as long as the standings before the round are unchanged."""
 
-def give_player_point(all_players: List[Player], pair: tuple[Player, Player], winner: str):
-    """Give the player a point based on the winner of the game."""
-    for player in all_players:
-        if winner == "draw":
-            if (player.name == pair[0].name) | (player.name == pair[1].name):
-                player.add_point_draw()
-                player.game_result.append(0.5)
-        elif player.name == winner:
-            player.add_point()
-            player.game_result.append(1.0)
-        elif (player.name in [pair[0].name, pair[1].name]) & (player.name != winner):
-            player.game_result.append(0.0)
-
-
-def determine_secondary_points(all_players: List[Player]):
-    """Create the secondary points for the players based on the points of the opponents."""
+    def __init__(self, fingerprint: str, pairs: List[tuple[str, str]], bye: Optional[str]):
+        """Initialize the round record."""
+        self.fingerprint = fingerprint
+        self.pairs = pairs
+        self.bye = bye
+
+
+def pairing_fingerprint(all_players: List[Player], method: str) -> str:
+    """Hash everything the pairing of the next round depends on."""
+    fingerprint = hashlib.sha1(method.encode())
     for player in all_players:
-        player.tiebreaker = 0.0
-        for opponent in all_players:
-            if opponent.name in player.previous_opponents:
-                player.tiebreaker += opponent.points
+        fingerprint.update(repr((player.name, player.points, player.no_game_found, player.previous_opponents)).encode())
+    return fingerprint.hexdigest()
+
+
+def winner_key(pair_names: tuple[str, str], round_number: int) -> str:
+    """Session state key of the selected winner of a pairing."""
+    return f"winner_{pair_names[0]}_{pair_names[1]}_{round_number}"
+
+
+def results_key(round_number: int) -> str:
+    """Session state key of the submitted results of a round, kept after its widgets are no longer shown."""
+    return f"results_{round_number}"
+
+
+def pair_key(pair_names: tuple[str, str]) -> str:
+    """Key of the result of a pairing, the same as in the event log."""
+    return "|".join(pair_names)
+
+
+def restore_rounds(rounds: Dict[str, Dict]):
+    """Restore the frozen pairings and the results of the rounds from the event log record."""
+    records = st.session_state.setdefault("round_records", {})
+    for round_key, round_record in rounds.items():
+        round_number = int(round_key)
+        pairs = [(player1, player2) for player1, player2 in round_record["pairs"]]
+        records[round_number] = RoundRecord(round_record["fingerprint"], pairs, round_record["bye"])
+        for pair_names in pairs:
+            winner = round_record["results"].get(pair_key(pair_names))
+            if winner is not None:
+                st.session_state[winner_key(pair_names, round_number)] = winner
+        if round_record["submitted"]:
+            st.session_state[results_key(round_number)] = dict(round_record["results"])
+
+
+def pairing_by_hand(players: List[Player], row_indices: List[int], col_indices: List[int]):
+    """Pair players by hand if the algorithm fails."""
+    st.write(f"row_indices: {row_indices}")
+    st.write(f"col_indices: {col_indices}")
+
+    st.write("Each list needs to be provided as the following [1, 2, 3, 4]")
+
+    solutionlist1 = st.text_input("List 1:")
+    solutionlist2 = st.text_input("List 2:")
+
+    first_score = sum(
+        [
+            abs(players[solutionlist1[i]].points - players[solutionlist1[i + 1]].points)
+            for i in range(0, len(solutionlist1), 2)
+        ]
+    )
+    second_score = sum(
+        [
+            abs(players[solutionlist2[i]].points - players[solutionlist2[i + 1]].points)
+            for i in range(0, len(solutionlist2), 2)
+        ]
+    )
+
+    # Filter out pairs where a player is paired with itself
+    if first_score <= second_score:
+        pairs = [(players[solutionlist1[i]], players[solutionlist1[i + 1]]) for i in range(0, len(solutionlist1), 2)]
+    else:
+        pairs = [(players[solutionlist2[i]], players[solutionlist2[i + 1]]) for i in range(0, len(solutionlist2), 2)]
+
+    return pairs
+
+
+def pair_by_hand(error: PairingError) -> List[tuple[Player, Player]]:
+    """Let the players be paired by hand after all pairing methods failed."""
+    st.error("!!!!!!!!!!! Third pairing method failed, provide pairing by hand !!!!!!!!!!!")
+    return pairing_by_hand(error.players, error.row_indices, error.col_indices)
+
+
+def cached_pairing(tournament: Tournament, round_number: int) -> List[tuple[Player, Player]]:
+    """Pair the players of a round, replaying the frozen record of the round instead of pairing again if possible."""
+    records = st.session_state.setdefault("round_records", {})
+    fingerprint = pairing_fingerprint(tournament.players, tournament.pairing_method)
+    record = records.get(round_number)
+    if record is not None and record.fingerprint == fingerprint:
+        return tournament.replay_round(record.pairs, record.bye)
+
+    pairs = tournament.pair_round(fallback=pair_by_hand)
+    records[round_number] = RoundRecord(
+        fingerprint, [(pair[0].name, pair[1].name) for pair in pairs], tournament.byes[-1]
+    )
+    event_log = st.session_state.get("event_log")
+    if event_log is not None:
+        event_log.log_pairing(round_number, fingerprint, records[round_number].pairs, tournament.byes[-1])
+    return pairs
 
 
 def img_to_bytes(img_path, resize_factor: int = 1):
     """Convert an image to bytes."""
+    from PIL import Image
+
     img = Image.open(img_path)
     img = img.resize((img.width // resize_factor, img.height // resize_factor))
     buffered = io.BytesIO()
@@ -58,51 +135,92 @@ def img_to_bytes(img_path, resize_factor: int = 1):
     return encoded
 
 
+@lru_cache(maxsize=None)
 def img_to_html(img_path, resize_factor: int = 1):
-    """Convert an image to HTML."""
+    """Convert an image to HTML, encoded once per image and size for the whole process."""
     img_html = "<img src='data:image/png;base64,{}' class='img-fluid'>".format(img_to_bytes(img_path, resize_factor))
     return img_html
 
 
+def submitted_results(pairs: List[tuple[Player, Player]], round_number: int) -> Optional[List[str]]:
+    """Winners of a submitted round, or None if the round is not submitted for these pairs."""
+    results = st.session_state.get(results_key(round_number))
+    if results is None:
+        return None
+    winners = [results.get(pair_key((pair[0].name, pair[1].name))) for pair in pairs]
+    if None in winners:
+        return None
+    return winners
+
+
+def head_to_head(pair_names: tuple[str, str]) -> str:
+    """Earlier games of the players of a pairing in all tournaments, empty if they never played each other."""
+    games, points = open_history().head_to_head(*pair_names)
+    if not games:
+        return ""
+    return f" (played {games} before, {pair_names[0]} scored {points:g})"
+
+
 def collect_results(
-    all_players: List[Player],
     pairs: List[tuple[Player, Player]],
+    colors: List[tuple[str, str]],
     round_number: int,
     col1: st.delta_generator.DeltaGenerator,
-):
-    """Collect the results of the games."""
+) -> Optional[List[str]]:
+    """Collect the results of the games, returns the winners once the round is submitted."""
     all_winners = []
     cnt = 0
-    for pair in pairs:
+    for pair, (color1, color2) in zip(pairs, colors):
         cnt += 1
-        color1, color2 = find_best_color(pair[0], pair[1])
         col11, col12 = col1.columns(2)
         col11.write("")
         col11.write("")
         col11.markdown(
-            f"""Pairing {cnt}: {pair[0].name} ({img_to_html(f'data/images/{color1}_pawn.png', 25)}) - {pair[1].name}
-            ({img_to_html(f'data/images/{color2}_pawn.png', 25)})""",
+            f"""Pairing {cnt}: {pair[0].name} ({img_to_html(pawn_path(color1), 25)}) - {pair[1].name}
+            ({img_to_html(pawn_path(color2), 25)}){head_to_head((pair[0].name, pair[1].name))}""",
             unsafe_allow_html=True,
         )
         winner = col12.selectbox(
             "Select winner or 'draw':",
             ["draw", pair[0].name, pair[1].name],
-            key=f"winner_{pair[0].name}_{pair[1].name}_{round_number}",
+            key=winner_key((pair[0].name, pair[1].name), round_number),
         )
-        pair[0].add_opponent(pair[1].name)
-        pair[1].add_opponent(pair[0].name)
         all_winners.append(winner)
 
-    submit_key = f"submit_{pair[0].name}_{pair[1].name}_{round_number}"
-    if submit_key not in st.session_state:
-        st.session_state[submit_key] = False
-
-    if col1.button("Submit", key=f"button_{pair[0].name}_{pair[1].name}_{round_number}"):
-        st.session_state[submit_key] = True
-
-    if not st.session_state[submit_key]:
-        st.stop()
-
-    for pair, winner in zip(pairs, all_winners):
-        give_player_point(all_players, pair, winner)
-        determine_secondary_points(all_players)
+    if not col1.button("Submit", key=f"button_{pair[0].name}_{pair[1].name}_{round_number}"):
+        return None
+
+    # Kept outside the widget keys, which are removed once the round is no longer edited
+    st.session_state[results_key(round_number)] = {
+        pair_key((pair[0].name, pair[1].name)): winner for pair, winner in zip(pairs, all_winners)
+    }
+    pair_names = [(pair[0].name, pair[1].name) for pair in pairs]
+    event_log = st.session_state.get("event_log")
+    if event_log is not None:
+        event_log.log_results(round_number, pair_names, all_winners)
+    scores = game_scores(pair_names, all_winners)
+    # Submitting a round again, also after restoring the session, does not rate its games twice
+    open_rating_store().update(pair_names, scores, rated_round_key(st.session_state["tournament_id"], round_number))
+    history_tournament = st.session_state.get("history_tournament")
+    if history_tournament is not None:
+        open_history().record_round(history_tournament, round_number, pair_names, colors, scores)
+
+    return all_winners
+
+
+def round_summary(
+    pairs: List[tuple[Player, Player]], colors: List[tuple[str, str]], winners: List[str]
+) -> "pd.DataFrame":
+    """Create the table of the results of a finished round."""
+    import pandas as pd
+
+    whites = [pair[0] if color1 == "white" else pair[1] for pair, (color1, _) in zip(pairs, colors)]
+    blacks = [pair[1] if color1 == "white" else pair[0] for pair, (color1, _) in zip(pairs, colors)]
+    return pd.DataFrame(
+        {
+            "Pairing": range(1, len(pairs) + 1),
+            "White": [player.name for player in whites],
+            "Black": [player.name for player in blacks],
+            "Winner": winners,
+        }
+    )
@@ -0,0 +1,59 @@
+"""Colours, points and tiebreaks of the games of the Swiss Chess tournament."""
+from typing import List
+
+from swiss_chess.utils.pairing import create_opponent_matrix
+from swiss_chess.utils.player import Player
+from swiss_chess.utils.state import player_ids, points_vector, shared_state
+from swiss_chess.utils.tiebreaks import TIEBREAK_SYSTEMS, opponent_points, record_game
+
+
+def find_best_color(player1: Player, player2: Player):
+    """Find the best color for each player based on the previous games."""
+    player1_ratio = player1.previous_white - player1.previous_black
+    player2_ratio = player2.previous_white - player2.previous_black
+    if player1_ratio > player2_ratio:
+        color1 = "black"
+        color2 = "white"
+    else:
+        color1 = "white"
+        color2 = "black"
+    player1.add_color(color1)
+    player2.add_color(color2)
+    return color1, color2
+
+
+def give_player_point(all_players: List[Player], pair: tuple[Player, Player], winner: str):
+    """Give the player a point based on the winner of the game."""
+    if winner == "draw":
+        scores = (0.5, 0.5)
+    else:
+        scores = (float(pair[0].name == winner), float(pair[1].name == winner))
+    for player, score in zip(pair, scores):
+        player.game_result.append(score)
+
+    state = shared_state(pair)
+    if state is not None:
+        record_game(state, pair[0].id, pair[1].id, scores[0])
+    else:
+        for player, score in zip(pair, scores):
+            player.points += score
+
+
+def determine_secondary_points(all_players: List[Player], tiebreaker: str = "Opponent points"):
+    """Create the secondary points for the players based on the selected tiebreak system."""
+    if tiebreaker == "Puzzle battle":
+        # Ties are only broken by the puzzle battles
+        for player in all_players:
+            player.tiebreaker = 0.0
+        return
+
+    state = shared_state(all_players)
+    if state is None:
+        tiebreakers = create_opponent_matrix(all_players) @ points_vector(all_players)
+        for player, tiebreaker_points in zip(all_players, tiebreakers):
+            player.tiebreaker = tiebreaker_points
+        return
+
+    ids = player_ids(all_players)
+    system = TIEBREAK_SYSTEMS.get(tiebreaker, opponent_points)
+    state.tiebreaker[ids] = system(state, ids)
@@ -0,0 +1,165 @@
+"""Monte Carlo simulation of Swiss Chess tournaments with rating based results."""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from swiss_chess.utils.tournament import Tournament
+
+DRAW_RATE = 0.3
+
+
+def game_probabilities(
+    ratings_white: np.ndarray, ratings_black: np.ndarray, draw_rate: float = DRAW_RATE
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the win and draw probabilities of the first player, based on the Elo expected score."""
+    expected = 1 / (1 + 10 ** ((ratings_black - ratings_white) / 400))
+    # Draws are most likely between equally rated players
+    draw = draw_rate * (1 - np.abs(2 * expected - 1))
+    return expected - draw / 2, draw
+
+
+def empty_results(n_players: int, rounds: int) -> Dict[str, np.ndarray]:
+    """Create the aggregated results of zero simulated tournaments."""
+    return {
+        "placements": np.zeros((n_players, n_players), dtype=np.int64),
+        "clear_winner": np.zeros(rounds, dtype=np.int64),
+        "color_imbalance": np.zeros(rounds + 1, dtype=np.int64),
+        "rematches": np.zeros(0, dtype=np.int64),
+    }
+
+
+def simulate_tournament(
+    ratings: np.ndarray,
+    rounds: int,
+    rng: np.random.Generator,
+    results: Dict[str, np.ndarray],
+    pairing_method: str = "score_groups",
+    tiebreaker: str = "Buchholz",
+    draw_rate: float = DRAW_RATE,
+) -> int:
+    """Simulate one tournament, add it to the aggregated results and return its number of rematches.
+
+    Players are identified by the index of their rating, and start in a random seeding order.
+    """
+    # Player IDs follow the seeding order, player names are the rating indices
+    seeding = rng.permutation(len(ratings))
+    tournament = Tournament([str(i) for i in seeding], pairing_method, tiebreaker)
+    state = tournament.state
+
+    rematches = 0
+    for round_number in range(rounds):
+        pairs = tournament.pair_round()
+        first = np.array([pair[0].id for pair in pairs], dtype=np.intp)
+        second = np.array([pair[1].id for pair in pairs], dtype=np.intp)
+        rematches += int(np.count_nonzero(state.games[first, second]))
+
+        win, draw = game_probabilities(ratings[seeding[first]], ratings[seeding[second]], draw_rate)
+        draws = rng.random(len(pairs))
+        winners = [
+            pair[0].name if u < p_win else "draw" if u < p_win + p_draw else pair[1].name
+            for pair, u, p_win, p_draw in zip(pairs, draws, win, draw)
+        ]
+        tournament.record_results(winners)
+
+        top_points = np.sort(state.points[: len(ratings)])[-2:]
+        results["clear_winner"][round_number] += top_points[1] > top_points[0]
+
+    standings = np.array([int(player.name) for player in tournament.standings()])
+    results["placements"][standings, np.arange(len(standings))] += 1
+    imbalance = np.abs(state.previous_white[: len(ratings)] - state.previous_black[: len(ratings)])
+    results["color_imbalance"] += np.bincount(imbalance, minlength=rounds + 1)[: rounds + 1]
+    return rematches
+
+
+def simulate_batch(
+    ratings: np.ndarray,
+    rounds: int,
+    n_tournaments: int,
+    seed: np.random.SeedSequence,
+    pairing_method: str = "score_groups",
+    tiebreaker: str = "Buchholz",
+    draw_rate: float = DRAW_RATE,
+) -> Dict[str, np.ndarray]:
+    """Simulate a batch of tournaments with its own seeded random generator."""
+    rng = np.random.default_rng(seed)
+    results = empty_results(len(ratings), rounds)
+    rematches = [
+        simulate_tournament(ratings, rounds, rng, results, pairing_method, tiebreaker, draw_rate)
+        for _ in range(n_tournaments)
+    ]
+    results["rematches"] = np.array(rematches, dtype=np.int64)
+    return results
+
+
+def simulate(
+    ratings: np.ndarray,
+    rounds: int,
+    n_tournaments: int,
+    seed: int = 42,
+    workers: Optional[int] = None,
+    batch_size: int = 100,
+    pairing_method: str = "score_groups",
+    tiebreaker: str = "Buchholz",
+    draw_rate: float = DRAW_RATE,
+) -> Dict[str, np.ndarray]:
+    """Simulate tournaments on a process pool and aggregate placements, rematches and colour imbalance.
+
+    - placements[i, p]: number of tournaments in which the player with rating index i finished at place p
+    - clear_winner[r]: number of tournaments with a single leader after round r + 1
+    - color_imbalance[d]: number of players with |white - black| games equal to d
+    - rematches[t]: number of rematches in tournament t
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    batch_sizes = [min(batch_size, n_tournaments - start) for start in range(0, n_tournaments, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    results = empty_results(len(ratings), rounds)
+    rematches: List[np.ndarray] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(simulate_batch, ratings, rounds, size, batch_seed, pairing_method, tiebreaker, draw_rate)
+            for size, batch_seed in zip(batch_sizes, seeds)
+        ]
+        for future in futures:
+            batch = future.result()
+            for key in ("placements", "clear_winner", "color_imbalance"):
+                results[key] += batch[key]
+            rematches.append(batch["rematches"])
+    results["rematches"] = np.concatenate(rematches) if rematches else results["rematches"]
+    return results
+
+
+def main():
+    """Run a simulation from the command line and store the aggregated arrays."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--tournaments", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pairing-method", default="score_groups")
+    parser.add_argument("--tiebreaker", default="Buchholz")
+    parser.add_argument("--output", default="simulation.npz")
+    args = parser.parse_args()
+
+    ratings = np.sort(np.random.default_rng(args.seed).normal(1500, 200, args.players))[::-1]
+    results = simulate(
+        ratings,
+        args.rounds,
+        args.tournaments,
+        seed=args.seed,
+        workers=args.workers,
+        pairing_method=args.pairing_method,
+        tiebreaker=args.tiebreaker,
+    )
+    np.savez(args.output, ratings=ratings, **results)
+
+    print(f"Clear winner after each round: {np.round(results['clear_winner'] / args.tournaments, 3)}")
+    print(f"Highest rated player wins: {results['placements'][0, 0] / args.tournaments:.3f}")
+    print(f"Tournaments with rematches: {np.mean(results['rematches'] > 0):.3f}")
+
+
+if __name__ == "__main__":
+    main()
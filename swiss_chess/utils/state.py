@@ -0,0 +1,143 @@
+"""Struct-of-arrays state of the Swiss Chess tournament."""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Per player fields stored as one NumPy array each, with their dtype
+PLAYER_FIELDS = {
+    "points": np.float64,
+    "tiebreaker": np.float64,
+    "no_game_found": np.int32,
+    "previous_white": np.int32,
+    "previous_black": np.int32,
+    "games_played": np.int32,
+    "buchholz": np.float64,
+    "sonneborn_berger": np.float64,
+    "progressive": np.float64,
+    "rating": np.float64,
+}
+
+# Player by player fields stored as one square NumPy array each, with their dtype
+PAIR_FIELDS = {
+    "opponents": np.bool_,
+    "results": np.float32,
+    "games": np.int16,
+    "met_before": np.bool_,
+}
+
+
+class TournamentState:
+    """Compact tournament state with integer player IDs, NumPy arrays per field and a dense opponent matrix."""
+
+    points: np.ndarray
+    tiebreaker: np.ndarray
+    no_game_found: np.ndarray
+    previous_white: np.ndarray
+    previous_black: np.ndarray
+    games_played: np.ndarray
+    buchholz: np.ndarray
+    sonneborn_berger: np.ndarray
+    progressive: np.ndarray
+    rating: np.ndarray
+    opponents: np.ndarray
+    results: np.ndarray
+    games: np.ndarray
+    met_before: np.ndarray
+
+    def __init__(self, capacity: int = 8):
+        """Initialize an empty state with room for `capacity` players."""
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.opponent_names: List[List[str]] = []
+        self.game_results: List[List[float]] = []
+        capacity = max(capacity, 1)
+        for field, dtype in PLAYER_FIELDS.items():
+            setattr(self, field, np.zeros(capacity, dtype=dtype))
+        for field, dtype in PAIR_FIELDS.items():
+            setattr(self, field, np.zeros((capacity, capacity), dtype=dtype))
+
+    def __len__(self) -> int:
+        """Return the number of players in the state."""
+        return len(self.names)
+
+    @property
+    def capacity(self) -> int:
+        """Return the number of players the arrays can hold without growing."""
+        return len(self.points)
+
+    def grow(self, capacity: int):
+        """Grow the arrays to hold at least `capacity` players."""
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for field in PLAYER_FIELDS:
+            array = getattr(self, field)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, field, grown)
+        for field in PAIR_FIELDS:
+            matrix = getattr(self, field)
+            grown = np.zeros((capacity, capacity), dtype=matrix.dtype)
+            grown[: len(matrix), : len(matrix)] = matrix
+            setattr(self, field, grown)
+
+    def add_player(self, name: str) -> int:
+        """Add a player to the state and return its integer ID."""
+        player_id = len(self.names)
+        self.grow(player_id + 1)
+        self.names.append(name)
+        self.index.setdefault(name, player_id)
+        self.opponent_names.append([])
+        self.game_results.append([])
+        return player_id
+
+    def add_opponent(self, player_id: int, opponent: str):
+        """Register a played opponent for the player, by name."""
+        self.opponent_names[player_id].append(opponent)
+        opponent_id = self.index.get(opponent)
+        if opponent_id is not None:
+            self.opponents[player_id, opponent_id] = True
+
+    def opponent_matrix(self, ids: Sequence[int]) -> np.ndarray:
+        """Return the boolean opponent matrix restricted to the given player IDs."""
+        return self.opponents[np.ix_(ids, ids)]
+
+    def add_met_before(self, pairs: Iterable[tuple[str, str]]):
+        """Register pairs of players, by name, that played each other in earlier tournaments."""
+        for name1, name2 in pairs:
+            id1, id2 = self.index.get(name1), self.index.get(name2)
+            if id1 is not None and id2 is not None:
+                self.met_before[id1, id2] = self.met_before[id2, id1] = True
+
+
+def shared_state(players: Sequence) -> Optional[TournamentState]:
+    """Return the state the players are a view over, if they all share the same one."""
+    if not players:
+        return None
+    state = players[0].state
+    if all(player.state is state for player in players):
+        return state
+    return None
+
+
+def player_ids(players: Sequence) -> np.ndarray:
+    """Return the integer IDs of the players."""
+    return np.fromiter((player.id for player in players), dtype=np.intp, count=len(players))
+
+
+def field_vector(players: Sequence, field: str) -> np.ndarray:
+    """Return a per player field of the players as a vector."""
+    state = shared_state(players)
+    if state is not None:
+        return getattr(state, field)[player_ids(players)].astype(float)
+    return np.fromiter((getattr(player, field) for player in players), dtype=float, count=len(players))
+
+
+def points_vector(players: Sequence) -> np.ndarray:
+    """Return the points of the players as a vector."""
+    return field_vector(players, "points")
+
+
+def ratings_vector(players: Sequence) -> np.ndarray:
+    """Return the ratings of the players as a vector."""
+    return field_vector(players, "rating")
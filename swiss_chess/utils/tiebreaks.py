@@ -0,0 +1,120 @@
+"""Tiebreak systems of the Swiss Chess tournament, computed on the results matrix of the tournament state."""
+from typing import Callable, Dict
+
+import numpy as np
+
+from swiss_chess.utils.state import TournamentState
+
+
+def record_game(state: TournamentState, player_id: int, opponent_id: int, score: float):
+    """Record one game result and update points, Buchholz and Sonneborn-Berger incrementally.
+
+    With G the games matrix and R the results matrix, Buchholz is G @ points and Sonneborn-Berger is R @ points.
+    A single game only changes two points and two matrix entries, so both are updated with two columns in O(n).
+    """
+    opponent_score = 1.0 - score
+    n = len(state)
+    # Opponents of both players see the new points reflected in their tiebreaks
+    state.buchholz[:n] += state.games[:n, player_id] * score + state.games[:n, opponent_id] * opponent_score
+    state.sonneborn_berger[:n] += state.results[:n, player_id] * score + state.results[:n, opponent_id] * opponent_score
+
+    state.points[player_id] += score
+    state.points[opponent_id] += opponent_score
+    state.games[player_id, opponent_id] += 1
+    state.games[opponent_id, player_id] += 1
+    state.results[player_id, opponent_id] += score
+    state.results[opponent_id, player_id] += opponent_score
+
+    # The new game itself adds the opponent's points
+    state.buchholz[player_id] += state.points[opponent_id]
+    state.buchholz[opponent_id] += state.points[player_id]
+    state.sonneborn_berger[player_id] += score * state.points[opponent_id]
+    state.sonneborn_berger[opponent_id] += opponent_score * state.points[player_id]
+
+
+def record_unplayed(state: TournamentState, player_id: int, score: float):
+    """Record the points of a player without a game, such as a bye, and update the tiebreaks of its opponents."""
+    n = len(state)
+    state.buchholz[:n] += state.games[:n, player_id] * score
+    state.sonneborn_berger[:n] += state.results[:n, player_id] * score
+    state.points[player_id] += score
+
+
+def end_round(state: TournamentState):
+    """Add the points after this round to the progressive score."""
+    state.progressive += state.points
+
+
+def opponent_points(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Sum of the points of every distinct opponent."""
+    return state.opponent_matrix(ids) @ state.points[ids]
+
+
+def buchholz(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Sum of the points of the opponents of every game."""
+    return state.buchholz[ids]
+
+
+def opponent_points_extremes(state: TournamentState, ids: np.ndarray, count: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Sums of the `count` lowest and highest points of the opponents, of fewer if a player has fewer opponents."""
+    n = len(state)
+    if n == 0:
+        return np.zeros(len(ids)), np.zeros(len(ids))
+    played = state.games[np.ix_(ids, np.arange(n))] > 0
+    points = np.broadcast_to(state.points[:n], played.shape)
+    count = min(count, n)
+    # Players that are not opponents sort last, and count as zero
+    lowest = np.partition(np.where(played, points, np.inf), count - 1, axis=1)[:, :count]
+    highest = np.partition(np.where(played, -points, np.inf), count - 1, axis=1)[:, :count]
+    lowest[np.isinf(lowest)] = 0.0
+    highest[np.isinf(highest)] = 0.0
+    return lowest.sum(axis=1), -highest.sum(axis=1)
+
+
+def buchholz_cut_1(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Buchholz without the opponent with the lowest points."""
+    lowest, _ = opponent_points_extremes(state, ids)
+    return state.buchholz[ids] - lowest
+
+
+def median_buchholz(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Buchholz without the opponents with the lowest and the highest points.
+
+    Nothing is cut below 3 opponents, and the two lowest and two highest are cut from 9 opponents on (FIDE).
+    """
+    n = len(state)
+    opponents = (state.games[np.ix_(ids, np.arange(n))] > 0).sum(axis=1)
+    lowest, highest = opponent_points_extremes(state, ids, count=1)
+    lowest_two, highest_two = opponent_points_extremes(state, ids, count=2)
+    cut = np.where(opponents >= 9, lowest_two + highest_two, np.where(opponents >= 3, lowest + highest, 0.0))
+    return state.buchholz[ids] - cut
+
+
+def sonneborn_berger(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Sum of the points of the beaten opponents plus half of the points of the drawn opponents."""
+    return state.sonneborn_berger[ids]
+
+
+def progressive_score(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Sum of the running score after every round."""
+    return state.progressive[ids]
+
+
+def direct_encounter(state: TournamentState, ids: np.ndarray) -> np.ndarray:
+    """Points scored in the games against the players with the same points."""
+    points = state.points[ids]
+    same_points = points[:, None] == points[None, :]
+    return (state.results[np.ix_(ids, ids)] * same_points).sum(axis=1)
+
+
+TIEBREAK_SYSTEMS: Dict[str, Callable[[TournamentState, np.ndarray], np.ndarray]] = {
+    "Opponent points": opponent_points,
+    "Buchholz": buchholz,
+    "Buchholz Cut-1": buchholz_cut_1,
+    "Median Buchholz": median_buchholz,
+    "Sonneborn-Berger": sonneborn_berger,
+    "Progressive score": progressive_score,
+    "Direct encounter": direct_encounter,
+}
+
+TIEBREAKERS = list(TIEBREAK_SYSTEMS) + ["Puzzle battle"]
@@ -0,0 +1,181 @@
+"""Headless engine of the Swiss Chess tournament, without any Streamlit calls."""
+from itertools import groupby
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from swiss_chess.utils.diagnostics import Diagnostic, emit, handle_diagnostics
+from swiss_chess.utils.pairing import PairingError, pairing
+from swiss_chess.utils.player import Player
+from swiss_chess.utils.scoring import determine_secondary_points, find_best_color, give_player_point
+from swiss_chess.utils.state import TournamentState
+from swiss_chess.utils.tiebreaks import end_round, record_unplayed
+
+
+class Tournament:
+    """Swiss Chess tournament engine that pairs rounds, records results, and computes and resolves the standings.
+
+    Warnings and errors are collected as diagnostics, and passed on to `on_diagnostic` when given.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        pairing_method: str = "graph",
+        tiebreaker: str = "Opponent points",
+        on_diagnostic: Optional[Callable[[Diagnostic], None]] = None,
+        ratings: Optional[Sequence[float]] = None,
+        met_before: Iterable[tuple[str, str]] = (),
+    ):
+        """Initialize the tournament with the players in their seeding order.
+
+        The ratings of the players and the pairs of players that met in earlier tournaments are used by the pairing.
+        """
+        self.state = TournamentState(capacity=len(names))
+        self.players = [Player(name, self.state) for name in names]
+        if ratings is not None:
+            self.state.rating[: len(names)] = ratings
+        self.state.add_met_before(met_before)
+        self.pairing_method = pairing_method
+        self.tiebreaker = tiebreaker
+        self.on_diagnostic = on_diagnostic
+        self.diagnostics: List[Diagnostic] = []
+        self.pairs: List[List[tuple[Player, Player]]] = []
+        self.colors: List[List[tuple[str, str]]] = []
+        self.byes: List[Optional[str]] = []
+        self.results: List[List[str]] = []
+        self.unplayed: List[Dict[str, float]] = []
+
+    def report(self, diagnostic: Diagnostic):
+        """Keep a diagnostic and pass it on."""
+        self.diagnostics.append(diagnostic)
+        if self.on_diagnostic is not None:
+            self.on_diagnostic(diagnostic)
+
+    @property
+    def round_number(self) -> int:
+        """Number of rounds paired so far."""
+        return len(self.pairs)
+
+    def pair_round(
+        self, fallback: Optional[Callable[[PairingError], List[tuple[Player, Player]]]] = None
+    ) -> List[tuple[Player, Player]]:
+        """Pair the next round, using `fallback` to pair by hand if all pairing methods fail."""
+        no_game_found = self.state.no_game_found[: len(self.players)].copy()
+        with handle_diagnostics(self.report):
+            try:
+                pairs = pairing(self.players, self.pairing_method)
+            except PairingError as error:
+                if fallback is None:
+                    raise
+                pairs = fallback(error)
+        byes = np.flatnonzero(self.state.no_game_found[: len(self.players)] != no_game_found)
+        bye = self.players[byes[0]].name if len(byes) else None
+        return self.start_round(pairs, bye)
+
+    def replay_round(self, pair_names: List[tuple[str, str]], bye: Optional[str]) -> List[tuple[Player, Player]]:
+        """Start the next round with a pairing that was made before."""
+        players_by_name = {player.name: player for player in self.players}
+        if bye is not None:
+            players_by_name[bye].add_no_game()
+            with handle_diagnostics(self.report):
+                emit("warning", f"Player {bye} has no pair.")
+        pairs = [(players_by_name[name1], players_by_name[name2]) for name1, name2 in pair_names]
+        return self.start_round(pairs, bye)
+
+    def start_round(
+        self,
+        pairs: List[tuple[Player, Player]],
+        bye: Optional[str],
+        colors: Optional[List[tuple[str, str]]] = None,
+    ) -> List[tuple[Player, Player]]:
+        """Give the colours, unless they are given, and register the opponents of the paired players."""
+        if colors is None:
+            colors = [find_best_color(player1, player2) for player1, player2 in pairs]
+        else:
+            for (player1, player2), (color1, color2) in zip(pairs, colors):
+                player1.add_color(color1)
+                player2.add_color(color2)
+        for player1, player2 in pairs:
+            player1.add_opponent(player2.name)
+            player2.add_opponent(player1.name)
+        self.pairs.append(pairs)
+        self.colors.append(colors)
+        self.byes.append(bye)
+        return pairs
+
+    def record_results(self, winners: List[str], unplayed: Optional[Dict[str, float]] = None):
+        """Record the winner, or 'draw', of every pairing of the last round.
+
+        `unplayed` gives the points of players without a game in the round, for byes scored by other rules.
+        """
+        pairs = self.pairs[-1]
+        if len(self.results) == len(self.pairs):
+            raise ValueError(f"The results of round {len(self.pairs)} are already recorded.")
+        if len(winners) != len(pairs):
+            raise ValueError(f"Expected {len(pairs)} results, got {len(winners)}.")
+        for pair, winner in zip(pairs, winners):
+            give_player_point(self.players, pair, winner)
+        if unplayed:
+            players_by_name = {player.name: player for player in self.players}
+            for name, score in unplayed.items():
+                record_unplayed(self.state, players_by_name[name].id, score)
+        end_round(self.state)
+        determine_secondary_points(self.players, self.tiebreaker)
+        self.results.append(list(winners))
+        self.unplayed.append(dict(unplayed or {}))
+
+    def standing_key(self, player: Player) -> tuple[float, float, int]:
+        """Sort key of the standings."""
+        return (player.points, player.tiebreaker, player.battle_score)
+
+    def standings(self) -> List[Player]:
+        """Return the players sorted by points and tiebreaker."""
+        return sorted(self.players, key=self.standing_key, reverse=True)
+
+    def tie_groups(self, places: int = 4) -> List[tuple[List[Player], int]]:
+        """Groups of tied players in the top places, with the number of places of each group inside the cut."""
+        groups = []
+        position = 0
+        for _, group in groupby(self.standings(), key=self.standing_key):
+            players = list(group)
+            if position < places and len(players) > 1:
+                groups.append((players, min(len(players), places - position)))
+            position += len(players)
+        return groups
+
+    def resolve_ties(self, decide: Callable[[Player, Player, int], Player], places: int = 4) -> List[Player]:
+        """Break the ties in the top places with battles, `decide` returns the winner of a numbered battle.
+
+        Every tie group is ordered by a knockout tournament sort: a knockout bracket finds the best player of the
+        group, who is then removed from the bracket to find the next one. Battles are remembered, so finding the next
+        player only replays the path of the removed one, and every player plays about log2(k) battles per place.
+        Only the places of the group inside the cut are resolved.
+        """
+        outcomes: Dict[FrozenSet[str], Player] = {}
+
+        def battle(player1: Player, player2: Player) -> Player:
+            pair = frozenset((player1.name, player2.name))
+            if pair not in outcomes:
+                outcomes[pair] = decide(player1, player2, len(outcomes) + 1)
+            return outcomes[pair]
+
+        for group, resolved in self.tie_groups(places):
+            bracket: List[Optional[Player]] = list(group)
+            for position in range(resolved):
+                winner = knockout(bracket, battle)
+                winner.battle_score = resolved - position
+                bracket[bracket.index(winner)] = None
+
+        return self.standings()
+
+
+def knockout(bracket: List[Optional[Player]], battle: Callable[[Player, Player], Player]) -> Player:
+    """Winner of a knockout bracket, empty slots give the opponent a bye."""
+    slots = bracket
+    while len(slots) > 1:
+        slots = [
+            player1 if player2 is None else player2 if player1 is None else battle(player1, player2)
+            for player1, player2 in zip(slots[0::2], slots[1::2] + [None])
+        ]
+    return slots[0]
@@ -0,0 +1,301 @@
+"""Import and export of tournaments in the FIDE Tournament Report File format (TRF16), one player line at a time.
+
+Every player is one fixed-width `001` line with the starting rank, name, rating, points and place, followed by one
+block of ten columns per round with the starting rank of the opponent, the colour and the result:
+
+    001    1      Carlsen, Magnus                   2830                                  2.0    1     3 w 1     2 b 1
+
+Only the fields the tournament uses are read, the other records and columns are skipped. Real events can be replayed
+and paired from the command line:
+
+    python -m swiss_chess.utils.trf event.trf --output event_paired.trf
+"""
+import argparse
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
+import numpy as np
+
+from swiss_chess.utils.diagnostics import emit, handle_diagnostics
+from swiss_chess.utils.player import Player
+from swiss_chess.utils.tournament import Tournament
+
+PLAYER_RECORD = "001"
+NAME_RECORD = "012"
+PLAYERS_RECORD = "062"
+ROUNDS_RECORD = "XXR"
+
+# Columns of the player record, counted from 0 with the end excluded
+RANK_COLUMNS = slice(4, 8)
+NAME_COLUMNS = slice(14, 47)
+RATING_COLUMNS = slice(48, 52)
+POINTS_COLUMNS = slice(80, 84)
+FIRST_ROUND_COLUMN = 91
+ROUND_WIDTH = 10
+NAME_WIDTH = NAME_COLUMNS.stop - NAME_COLUMNS.start
+
+# Scores of the results of a played game
+GAME_SCORES = {"1": 1.0, "W": 1.0, "=": 0.5, "D": 0.5, "0": 0.0, "L": 0.0}
+# Scores of the results of a round without a game, forfeits included, the pairing-allocated bye "U" is scored by
+# the event
+UNPLAYED_SCORES = {"F": 1.0, "+": 1.0, "H": 0.5, "Z": 0.0, "-": 0.0}
+UNPLAYED_CODES = {1.0: "F", 0.5: "H", 0.0: "Z"}
+BYE_CODE = "U"
+BYE_SCORE = 1.0
+# The byes of this app score nothing, they are written as zero-point byes
+APP_BYE_CODE = UNPLAYED_CODES[0.0]
+
+
+class TrfPlayer(NamedTuple):
+    """Player line of a tournament report file, with the starting rank of the opponent of every round."""
+
+    rank: int
+    name: str
+    rating: float
+    points: float
+    opponents: tuple[int, ...]
+    colors: str
+    results: str
+
+
+def parse_player(line: str) -> TrfPlayer:
+    """Parse a player line, rounds without an opponent have opponent 0."""
+    line = line.rstrip("\r\n")
+    rounds = range(FIRST_ROUND_COLUMN, len(line), ROUND_WIDTH)
+    blocks = [line[start : start + ROUND_WIDTH - 2].ljust(ROUND_WIDTH - 2) for start in rounds]
+    return TrfPlayer(
+        rank=int(line[RANK_COLUMNS]),
+        name=line[NAME_COLUMNS].strip(),
+        rating=float(line[RATING_COLUMNS].strip() or 0),
+        points=float(line[POINTS_COLUMNS].strip() or 0),
+        opponents=tuple(int(block[0:4].strip() or 0) for block in blocks),
+        colors="".join(block[5] for block in blocks),
+        results="".join(block[7] for block in blocks),
+    )
+
+
+def read_trf(lines: Iterable[str]) -> Iterator[TrfPlayer]:
+    """Iterate over the players of a tournament report file, reading one line at a time."""
+    for line in lines:
+        if line.startswith(PLAYER_RECORD):
+            yield parse_player(line)
+
+
+class RoundTable(NamedTuple):
+    """Rounds of all players of a tournament report file as arrays with one row per player and one column per round."""
+
+    names: List[str]
+    ranks: np.ndarray
+    ratings: np.ndarray
+    points: np.ndarray
+    opponents: np.ndarray
+    colors: np.ndarray
+    results: np.ndarray
+
+
+def read_round_table(lines: Iterable[str]) -> RoundTable:
+    """Read the players into flat arrays while streaming the file, and shape them into a round table at the end."""
+    names: List[str] = []
+    ranks, ratings, points = array("q"), array("d"), array("d")
+    offsets, opponents = array("q", [0]), array("q")
+    colors, results = bytearray(), bytearray()
+    for player in read_trf(lines):
+        names.append(player.name)
+        ranks.append(player.rank)
+        ratings.append(player.rating)
+        points.append(player.points)
+        opponents.extend(player.opponents)
+        colors.extend(player.colors.encode("ascii"))
+        results.extend(player.results.encode("ascii"))
+        offsets.append(len(opponents))
+
+    lengths = np.diff(np.asarray(offsets))
+    n_rounds = int(lengths.max()) if len(names) else 0
+    rows = np.repeat(np.arange(len(names)), lengths)
+    columns = np.arange(len(opponents)) - np.repeat(np.asarray(offsets)[:-1], lengths)
+    table = RoundTable(
+        names=names,
+        ranks=np.asarray(ranks),
+        ratings=np.asarray(ratings),
+        points=np.asarray(points),
+        opponents=np.zeros((len(names), n_rounds), dtype=np.int64),
+        colors=np.full((len(names), n_rounds), ord("-"), dtype=np.uint8),
+        results=np.full((len(names), n_rounds), ord(" "), dtype=np.uint8),
+    )
+    table.opponents[rows, columns] = np.asarray(opponents)
+    table.colors[rows, columns] = np.frombuffer(bytes(colors), dtype=np.uint8)
+    table.results[rows, columns] = np.frombuffer(bytes(results), dtype=np.uint8)
+    return table
+
+
+def opponent_rows(table: RoundTable) -> np.ndarray:
+    """Row of the opponent of every player in every round, -1 without an opponent."""
+    max_rank = int(table.ranks.max(initial=0))
+    row_of_rank = np.full(max_rank + 1, -1)
+    row_of_rank[table.ranks] = np.arange(len(table.names))
+    paired = table.opponents > 0
+    rows = np.where(paired, row_of_rank[np.minimum(table.opponents, max_rank)], -1)
+    unknown = paired & ((table.opponents > max_rank) | (rows < 0))
+    if unknown.any():
+        player, round_number = np.argwhere(unknown)[0]
+        raise ValueError(
+            f"Player {table.ranks[player]} plays unknown player {table.opponents[player, round_number]} "
+            f"in round {round_number + 1}."
+        )
+    mutual = table.opponents[np.maximum(rows, 0), np.arange(rows.shape[1])] == table.ranks[:, None]
+    if (paired & ~mutual).any():
+        player, round_number = np.argwhere(paired & ~mutual)[0]
+        raise ValueError(
+            f"Player {table.ranks[player]} plays player {table.opponents[player, round_number]} in round "
+            f"{round_number + 1}, who does not play player {table.ranks[player]}."
+        )
+    return rows
+
+
+def replay_rounds(tournament: Tournament, table: RoundTable, bye_score: float = BYE_SCORE):
+    """Replay the rounds of the round table in the tournament, with the colours and results of the file.
+
+    Forfeits are not games, both players score the round as unplayed and can still be paired with each other. A
+    pairing-allocated bye, or a zero-point bye without an opponent, is the bye of the round.
+    """
+    rows = opponent_rows(table)
+    players = tournament.players
+    for round_number in range(rows.shape[1]):
+        opponents = rows[:, round_number]
+        results = table.results[:, round_number].tobytes().decode("ascii")
+        colors = table.colors[:, round_number].tobytes().decode("ascii")
+        pairs, pair_colors, winners = [], [], []
+        unplayed: Dict[str, float] = {}
+        bye = None
+        for i, j in enumerate(opponents):
+            played = j >= 0 and results[i] in GAME_SCORES and results[j] in GAME_SCORES
+            if not played:
+                if results[i] == BYE_CODE or (results[i] == APP_BYE_CODE and j < 0 and bye is None):
+                    players[i].add_no_game()
+                    bye = bye or players[i].name
+                    if results[i] == BYE_CODE:
+                        unplayed[players[i].name] = bye_score
+                elif results[i] != " ":
+                    unplayed[players[i].name] = UNPLAYED_SCORES.get(results[i], 0.0)
+            elif i < j:
+                pairs.append((players[i], players[j]))
+                pair_colors.append(("black", "white") if colors[i] == "b" else ("white", "black"))
+                score = GAME_SCORES.get(results[i], 0.0)
+                winners.append("draw" if score == 0.5 else players[i].name if score == 1.0 else players[j].name)
+        tournament.start_round(pairs, bye, pair_colors)
+        tournament.record_results(winners, unplayed)
+
+
+def load_trf(
+    path: str, pairing_method: str = "graph", tiebreaker: str = "Opponent points", bye_score: float = BYE_SCORE
+) -> Tournament:
+    """Load a tournament from a tournament report file, with the players in the order of the file.
+
+    The pairing-allocated bye scores `bye_score`.
+    """
+    with open(path, encoding="utf-8") as file:
+        table = read_round_table(file)
+    tournament = Tournament(table.names, pairing_method, tiebreaker, ratings=table.ratings)
+    replay_rounds(tournament, table, bye_score)
+
+    points = tournament.state.points[: len(table.names)]
+    different = np.flatnonzero(points != table.points)
+    if len(different):
+        with handle_diagnostics(tournament.report):
+            emit(
+                "warning",
+                f"The points of {len(different)} players differ from the file, "
+                f"for example {table.names[different[0]]}: {points[different[0]]} instead of "
+                f"{table.points[different[0]]}.",
+            )
+    return tournament
+
+
+def round_block(opponent: int, color: str, result: str) -> str:
+    """Columns of one round of a player line, a round without an opponent is written with opponent 0000."""
+    return f"  {opponent:4d} {color} {result}" if opponent else f"  0000 {color} {result}"
+
+
+def trf_lines(tournament: Tournament, name: str = "", fide_ratings: bool = False) -> Iterator[str]:
+    """Lines of the tournament report file of the recorded rounds, the starting rank is the order of the players.
+
+    The rating column is only written with `fide_ratings`, when the ratings of the players were read from a tournament
+    report file. The ratings of this app are club ratings and are left out.
+    """
+    players = tournament.players
+    n_rounds = len(tournament.results)
+    yield f"{NAME_RECORD} {name}".rstrip()
+    yield f"{PLAYERS_RECORD} {len(players)}"
+    yield f"{ROUNDS_RECORD} {n_rounds}"
+
+    opponents = np.zeros((len(players), n_rounds), dtype=np.int64)
+    colors = np.full((len(players), n_rounds), "-")
+    results = np.full((len(players), n_rounds), UNPLAYED_CODES[0.0])
+    players_by_name = {player.name: player for player in players}
+    for round_number in range(n_rounds):
+        round_pairs = zip(
+            tournament.pairs[round_number], tournament.colors[round_number], tournament.results[round_number]
+        )
+        for (player1, player2), (color1, color2), winner in round_pairs:
+            opponents[player1.id, round_number] = player2.id + 1
+            opponents[player2.id, round_number] = player1.id + 1
+            colors[player1.id, round_number], colors[player2.id, round_number] = color1[0], color2[0]
+            if winner == "draw":
+                results[[player1.id, player2.id], round_number] = "="
+            else:
+                results[player1.id, round_number] = "1" if winner == player1.name else "0"
+                results[player2.id, round_number] = "1" if winner == player2.name else "0"
+        for player_name, score in tournament.unplayed[round_number].items():
+            results[players_by_name[player_name].id, round_number] = UNPLAYED_CODES.get(score, UNPLAYED_CODES[0.0])
+        bye = tournament.byes[round_number]
+        if bye is not None:
+            results[players_by_name[bye].id, round_number] = APP_BYE_CODE
+
+    places = {player.name: place for place, player in enumerate(tournament.standings(), 1)}
+    for player in players:
+        rating = f"{round(player.rating):4d}" if fide_ratings and player.rating else ""
+        line = (
+            f"{PLAYER_RECORD} {player.id + 1:4d} {'':4} {player.name[:NAME_WIDTH]:<{NAME_WIDTH}} {rating:>4} "
+            f"{'':3} {'':11} {'':10} {player.points:4.1f} {places[player.name]:4d}"
+        )
+        rounds = zip(opponents[player.id], colors[player.id], results[player.id])
+        yield line + "".join(round_block(opponent, color, result) for opponent, color, result in rounds)
+
+
+def write_trf(tournament: Tournament, path: str, name: str = "", fide_ratings: bool = False):
+    """Write the tournament report file of the recorded rounds, one line at a time."""
+    with open(path, "w", encoding="utf-8") as file:
+        for line in trf_lines(tournament, name, fide_ratings):
+            file.write(line + "\n")
+
+
+def expected_winner(pair: tuple[Player, Player]) -> str:
+    """Result of a paired game by rating, a draw between equal ratings."""
+    player1, player2 = pair
+    if player1.rating == player2.rating:
+        return "draw"
+    return player1.name if player1.rating > player2.rating else player2.name
+
+
+def main():
+    """Replay a tournament report file, pair the next rounds and write the report of the result."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trf", help="Tournament report file to replay.")
+    parser.add_argument("--rounds", type=int, default=1, help="Number of rounds to pair after the replay.")
+    parser.add_argument("--pairing-method", default="graph")
+    parser.add_argument("--bye-score", type=float, default=BYE_SCORE)
+    parser.add_argument("--output", help="Tournament report file with the paired rounds, drawn by rating.")
+    args = parser.parse_args()
+
+    tournament = load_trf(args.trf, args.pairing_method, bye_score=args.bye_score)
+    for _ in range(args.rounds):
+        pairs = tournament.pair_round()
+        tournament.record_results([expected_winner(pair) for pair in pairs])
+        print(f"Round {tournament.round_number}: {len(pairs)} pairs")
+    if args.output:
+        # The ratings were read from the replayed file
+        write_trf(tournament, args.output, fide_ratings=True)
+
+
+if __name__ == "__main__":
+    main()
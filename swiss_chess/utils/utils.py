@@ -1,17 +1,36 @@
 """Utils file for swiss_chess package."""
-import requests  # type: ignore
-import streamlit as st
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+if TYPE_CHECKING:
+    import requests  # type: ignore
 
-@st.cache_data
-def chess_puzzle_api(
-    rating: int, moves: int, iteration: int, count: int = 1, deviation: int = 100
-) -> requests.models.Response:
-    """Get a chess puzzle from the chess-puzzles API."""
-    # To avoid having the same puzzle created multiple times
-    _ = iteration
+API_URL = "https://chess-puzzles.p.rapidapi.com/"
+API_HOST = "chess-puzzles.p.rapidapi.com"
+API_KEY_VARIABLE = "RAPIDAPI_KEY"
+API_TIMEOUT = 10
+
+
+def api_key() -> str:
+    """Key of the chess-puzzles API, from the environment."""
+    key = os.environ.get(API_KEY_VARIABLE)
+    if not key:
+        raise RuntimeError(f"Set {API_KEY_VARIABLE} to the key of the chess-puzzles API to get online puzzles.")
+    return key
 
-    url = "https://chess-puzzles.p.rapidapi.com/"
+
+def chess_puzzle_api(
+    rating: int,
+    moves: int,
+    count: int = 1,
+    deviation: int = 100,
+    session: Optional["requests.Session"] = None,
+    url: str = API_URL,
+    timeout: float = API_TIMEOUT,
+) -> List[Dict]:
+    """Get `count` chess puzzles from the chess-puzzles API, over a shared session when given."""
+    # requests is imported on first use, the offline puzzle store does not need it
+    import requests  # type: ignore
 
     querystring = {
         "rating": str(rating),
@@ -21,10 +40,11 @@ def chess_puzzle_api(
     }
 
     headers = {
-        "x-rapidapi-key": "4f0b83448emsh7e58e9aa99360b9p12231djsn80558b96a14a",
-        "x-rapidapi-host": "chess-puzzles.p.rapidapi.com",
+        "x-rapidapi-key": api_key(),
+        "x-rapidapi-host": API_HOST,
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = (session or requests).get(url, headers=headers, params=querystring, timeout=timeout)
+    response.raise_for_status()
 
-    return response
+    return response.json()["puzzles"]
@@ -0,0 +1,48 @@
+"""Tests of the crash recovery and the log paths of the event log."""
+import os
+
+import pytest
+
+from swiss_chess.utils.event_log import EventLog, log_path
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path):
+    path = str(tmp_path / "tournament.jsonl")
+    event_log = EventLog(path)
+    event_log.register_players(["Alice", "Bob"])
+    with open(path, "a", encoding="utf-8") as file:
+        # A crash while appending leaves half an event
+        file.write('{"event":"register","na')
+
+    event_log = EventLog(path)
+    assert event_log.record["players"] == ["Alice", "Bob"]
+    event_log.log_pairing(0, "fingerprint", [("Alice", "Bob")], None)
+    event_log.log_results(0, [("Alice", "Bob")], ["Alice"])
+
+    record = EventLog(path).record
+    assert record["players"] == ["Alice", "Bob"]
+    assert record["rounds"]["0"]["results"] == {"Alice|Bob": "Alice"}
+    assert record["rounds"]["0"]["submitted"]
+
+
+def test_log_without_any_complete_line_is_emptied(tmp_path):
+    path = tmp_path / "tournament.jsonl"
+    path.write_text('{"event":"reg')
+    EventLog(str(path)).register_players(["Alice"])
+    assert EventLog(str(path)).record["players"] == ["Alice"]
+
+
+def test_log_path_is_inside_the_log_directory(tmp_path):
+    log_dir = str(tmp_path / "logs")
+    assert log_path("tournament.jsonl", log_dir) == os.path.join(os.path.realpath(log_dir), "tournament.jsonl")
+    for name in ["../tournament.jsonl", "/etc/passwd", "~/.bashrc", "..", ".", "sub/tournament.jsonl"]:
+        with pytest.raises(ValueError):
+            log_path(name, log_dir)
+
+
+def test_log_path_does_not_follow_links_out_of_the_log_directory(tmp_path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "link.jsonl").symlink_to(tmp_path / "outside.jsonl")
+    with pytest.raises(ValueError):
+        log_path("link.jsonl", str(log_dir))
@@ -0,0 +1,48 @@
+"""Tests of the SQLite history of the tournaments."""
+import pytest
+
+from swiss_chess.utils.history import History
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = History(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def test_tournament_is_continued_by_its_key(history):
+    first = history.start_tournament("a1b2", "tournament.jsonl")
+    assert history.start_tournament("a1b2") == first
+    assert history.start_tournament("c3d4", "tournament.jsonl") != first
+
+
+def test_head_to_head_and_met_before(history):
+    earlier = history.start_tournament("earlier")
+    history.record_round(earlier, 0, [("Alice", "Bob"), ("Carol", "Dave")], [("white", "black")] * 2, [1.0, 0.5])
+    history.record_round(earlier, 1, [("Bob", "Alice")], [("white", "black")], [0.5])
+    # A round that is submitted again replaces its games
+    history.record_round(earlier, 1, [("Bob", "Alice")], [("white", "black")], [0.0])
+
+    assert history.head_to_head("Alice", "Bob") == (2, 2.0)
+    assert history.head_to_head("Bob", "Alice") == (2, 0.0)
+    assert history.head_to_head("Alice", "Carol") == (0, 0.0)
+
+    current = history.start_tournament("current")
+    history.record_round(current, 0, [("Alice", "Carol")], [("white", "black")], [1.0])
+    met = history.met_before(["Alice", "Bob", "Carol"], current)
+    assert sorted(met) == [("Alice", "Bob"), ("Bob", "Alice")]
+
+
+def test_colour_history_counts_the_colours_of_all_tournaments(history):
+    first = history.start_tournament("first")
+    history.record_round(first, 0, [("Alice", "Bob")], [("white", "black")], [1.0])
+    second = history.start_tournament("second")
+    history.record_round(second, 0, [("Alice", "Carol")], [("white", "black")], [0.5])
+    history.record_round(second, 1, [("Bob", "Alice")], [("white", "black")], [0.0])
+
+    assert history.colour_history(["Alice", "Bob", "Carol", "Dave"]) == {
+        "Alice": (2, 1),
+        "Bob": (1, 1),
+        "Carol": (0, 1),
+    }
@@ -0,0 +1,162 @@
+"""Tests that every pairing method and the fallback of the optimal pairing pair all players exactly once."""
+import random
+from typing import List
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from swiss_chess.utils import pairing as pairing_module
+from swiss_chess.utils.diagnostics import Diagnostic, handle_diagnostics
+from swiss_chess.utils.pairing import (
+    PAIRING_METHODS,
+    assignment_cycles,
+    create_cost_matrix,
+    create_opponent_matrix,
+    get_pairs,
+    get_pairs_anytime,
+    get_pairs_score_groups,
+    get_pairs_sophisticated,
+    get_pairs_sparse,
+    optimal_pairing,
+    pairing,
+)
+from swiss_chess.utils.player import Player
+from swiss_chess.utils.tournament import Tournament
+
+
+def mid_tournament(n_players: int, rounds: int = 4, seed: int = 0) -> Tournament:
+    """Play some rounds with random results."""
+    rng = random.Random(seed)
+    tournament = Tournament([f"Player {i}" for i in range(n_players)], "score_groups")
+    for _ in range(rounds):
+        pairs = tournament.pair_round()
+        tournament.record_results([rng.choice(["draw", pair[0].name, pair[1].name]) for pair in pairs])
+    return tournament
+
+
+def assert_complete(pairs: List[tuple[Player, Player]], players: List[Player]):
+    """Every player is paired exactly once, and never with itself."""
+    names = [player.name for pair in pairs for player in pair]
+    assert len(pairs) == len(players) // 2
+    assert sorted(names) == sorted(player.name for player in players)
+    assert all(first is not second for first, second in pairs)
+
+
+def even_players(tournament: Tournament) -> List[Player]:
+    players = sorted(tournament.players, key=lambda x: x.points)
+    return players[: len(players) - len(players) % 2]
+
+
+@pytest.fixture(scope="module")
+def tournament_128() -> Tournament:
+    return mid_tournament(128)
+
+
+@pytest.mark.parametrize("method", list(PAIRING_METHODS))
+def test_every_method_pairs_128_players(tournament_128, method):
+    players = even_players(tournament_128)
+    assert_complete(PAIRING_METHODS[method](players, create_cost_matrix(players)), players)
+    assert_complete(optimal_pairing(players, method), players)
+
+
+def test_fallback_pairs_128_players(tournament_128, monkeypatch):
+    players = even_players(tournament_128)
+
+    def failing(players, cost_matrix):
+        raise RuntimeError("pairing method failed")
+
+    monkeypatch.setitem(PAIRING_METHODS, "failing", failing)
+    assert_complete(optimal_pairing(players, "failing"), players)
+
+    # The last fallback after the split of the assignment
+    monkeypatch.setattr(pairing_module, "get_pairs_sophisticated", failing)
+    assert_complete(optimal_pairing(players, "failing"), players)
+
+
+@pytest.mark.parametrize("n_players", [128, 512])
+def test_assignment_with_odd_cycles_gives_a_complete_pairing(n_players):
+    players = even_players(mid_tournament(n_players, rounds=3))
+    row_indices, col_indices = linear_sum_assignment(create_cost_matrix(players))
+    assert_complete(get_pairs_sophisticated(players, list(row_indices), list(col_indices)), players)
+
+
+def test_odd_cycles_are_repaired():
+    players = [Player(f"Player {i}") for i in range(6)]
+    for player, points in zip(players, [0, 0, 0, 1, 1, 1]):
+        player.points = points
+    # Two cycles of three players
+    row_indices = [0, 1, 2, 3, 4, 5]
+    col_indices = [1, 2, 0, 4, 5, 3]
+    assert [len(cycle) for cycle in assignment_cycles(row_indices, col_indices)] == [3, 3]
+    pairs = get_pairs_sophisticated(players, row_indices, col_indices)
+    assert_complete(pairs, players)
+    # One player of every cycle is left out, the two of them play each other
+    assert sum(first.points != second.points for first, second in pairs) == 1
+
+
+def test_odd_number_of_players_leaves_one_out(tournament_128):
+    players = tournament_128.players[:-1]
+    pairs = pairing(list(players), "sparse")
+    assert len(pairs) == 63
+    assert len({player.name for pair in pairs for player in pair}) == 126
+    assert np.all([first is not second for first, second in pairs])
+
+
+def pairing_cost(pairs: List[tuple[Player, Player]], players: List[Player]) -> float:
+    cost_matrix = create_cost_matrix(players)
+    index = {player.name: i for i, player in enumerate(players)}
+    return sum(cost_matrix[index[first.name], index[second.name]] for first, second in pairs)
+
+
+def max_gap(pairs: List[tuple[Player, Player]]) -> float:
+    return max(abs(first.points - second.points) for first, second in pairs)
+
+
+@pytest.mark.parametrize("n_players, rounds", [(32, 3), (64, 7)])
+@pytest.mark.parametrize("seed", range(4))
+def test_sparse_pairing_is_close_to_the_exact_matching(n_players, rounds, seed):
+    players = even_players(mid_tournament(n_players, rounds, seed))
+    cost_matrix = create_cost_matrix(players)
+    sparse = get_pairs_sparse(players, cost_matrix)
+    exact = get_pairs(players, cost_matrix)
+    assert_complete(sparse, players)
+    assert pairing_cost(sparse, players) <= 1.25 * pairing_cost(exact, players) + 1e-9
+    assert max_gap(sparse) <= max_gap(exact)
+
+
+def test_sparse_pairing_of_a_large_field_stays_close_in_points():
+    players = even_players(mid_tournament(512, rounds=7))
+    pairs = get_pairs_sparse(players, create_cost_matrix(players))
+    assert_complete(pairs, players)
+    assert max_gap(pairs) <= 1.0
+    opponents = create_opponent_matrix(players)
+    index = {player.name: i for i, player in enumerate(players)}
+    assert not any(opponents[index[first.name], index[second.name]] for first, second in pairs)
+
+
+def players_with_points(points: List[float]) -> List[Player]:
+    players = [Player(f"Player {i}") for i in range(len(points))]
+    for player, player_points in zip(players, points):
+        player.points = player_points
+    return players
+
+
+def test_large_point_gap_is_not_a_rematch():
+    # A gap of 12 points costs more than a rematch, without being one
+    players = players_with_points([0, 12])
+    diagnostics: List[Diagnostic] = []
+    with handle_diagnostics(diagnostics.append):
+        pairs = get_pairs_anytime(players, create_cost_matrix(players))
+    assert_complete(pairs, players)
+    assert diagnostics == []
+
+
+def test_score_groups_float_only_real_rematches():
+    players = players_with_points([20, 20, 10, 10, 0, 0])
+    players[0].add_opponent(players[1].name)
+    players[1].add_opponent(players[0].name)
+    pairs = get_pairs_score_groups(players, create_cost_matrix(players))
+    assert_complete(pairs, players)
+    assert {frozenset((first.name, second.name)) for first, second in pairs} >= {frozenset(("Player 4", "Player 5"))}
+    assert max_gap(pairs) == 10
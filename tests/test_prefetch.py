@@ -0,0 +1,120 @@
+"""Tests of the puzzle prefetcher against a local stand-in of the chess-puzzles API."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from swiss_chess.utils.prefetch import PuzzlePrefetcher
+from swiss_chess.utils.utils import API_KEY_VARIABLE
+
+
+class PuzzleApi(ThreadingHTTPServer):
+    """Chess-puzzles API that records its requests and fails while `status` is an error."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), PuzzleHandler)
+        self.requests = []
+        self.status = 200
+        self.puzzles = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class PuzzleHandler(BaseHTTPRequestHandler):
+    server: PuzzleApi
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append((query, self.headers["x-rapidapi-key"]))
+        if self.server.status != 200:
+            self.send_error(self.server.status)
+            return
+        puzzles = []
+        for _ in range(int(query["count"])):
+            self.server.puzzles += 1
+            puzzles.append({"puzzleid": str(self.server.puzzles), "fen": "8/8/8/8/8/8/8/8 w - - 0 1", "moves": []})
+        body = json.dumps({"puzzles": puzzles}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv(API_KEY_VARIABLE, "test-key")
+    server = PuzzleApi()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def prefetcher(api):
+    prefetcher = PuzzlePrefetcher(url=api.url, batch_size=5, low_water=2, timeout=5)
+    yield prefetcher
+    prefetcher.close()
+
+
+def test_puzzles_are_fetched_in_batches(api, prefetcher):
+    prefetcher.prefetch(1500, 2).result()
+    assert len(api.requests) == 1
+    query, key = api.requests[0]
+    assert query["count"] == "5" and query["rating"] == "1500" and query["playerMoves"] == "2"
+    assert key == "test-key"
+    assert len(prefetcher.queues[(1500, 2)]) == 5
+
+    # A full queue is not refilled
+    assert prefetcher.prefetch(1500, 2) is None
+    assert len(api.requests) == 1
+
+
+def test_queue_is_refilled_below_the_low_water_mark(api, prefetcher):
+    prefetcher.prefetch(1500, 2).result()
+    ids = [prefetcher.get(1500, 2)["puzzleid"] for _ in range(2)]
+    assert len(api.requests) == 1
+
+    # The third puzzle leaves two in the queue, which starts a refill
+    ids.append(prefetcher.get(1500, 2)["puzzleid"])
+    prefetcher.pending[(1500, 2)].result()
+    assert len(api.requests) == 2
+    assert len(prefetcher.queues[(1500, 2)]) == 7
+    assert ids == ["1", "2", "3"]
+
+
+def test_failed_fetch_is_logged_and_backed_off(api, prefetcher, caplog):
+    api.status = 500
+    prefetcher.prefetch(1500, 2).result()
+    assert "failed" in caplog.text
+    assert not prefetcher.queues.get((1500, 2))
+    assert (1500, 2) in prefetcher.failures
+
+    # No background refills during the backoff, the direct fetch of a puzzle raises the error of the API
+    assert prefetcher.prefetch(1500, 2) is None
+    with pytest.raises(Exception, match="500"):
+        prefetcher.get(1500, 2)
+    assert len(api.requests) == 2
+
+    # A successful fetch after the backoff clears the failure
+    api.status = 200
+    prefetcher.backoff = 0
+    prefetcher.prefetch(1500, 2).result()
+    assert (1500, 2) not in prefetcher.failures
+    assert len(prefetcher.queues[(1500, 2)]) == 5
+
+
+def test_api_key_is_required(api, prefetcher, monkeypatch):
+    monkeypatch.delenv(API_KEY_VARIABLE)
+    with pytest.raises(RuntimeError, match=API_KEY_VARIABLE):
+        prefetcher.get(1500, 2)
+    assert not api.requests
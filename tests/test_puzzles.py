@@ -0,0 +1,42 @@
+"""Tests of the offline puzzle store."""
+import numpy as np
+import pytest
+
+from swiss_chess.utils.puzzles import PuzzleStore, build_puzzle_store
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+# Id, FEN, moves and rating of every puzzle, the first move is the opponent's
+PUZZLES = [
+    ("a", "e7e5 g1f3", 800),
+    ("b", "e7e5 g1f3", 1450),
+    ("c", "e7e5 g1f3", 1520),
+    ("d", "e7e5 g1f3 b8c6 f1b5", 1480),
+    ("e", "e7e5 g1f3 b8c6 f1b5", 2300),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    csv_path = tmp_path / "puzzles.csv"
+    lines = ["PuzzleId,FEN,Moves,Rating,RatingDeviation,Popularity,NbPlays,Themes,GameUrl,OpeningTags"]
+    lines += [f"{puzzle_id},{FEN},{moves},{rating},75,90,100,short,," for puzzle_id, moves, rating in PUZZLES]
+    csv_path.write_text("\n".join(lines) + "\n")
+    assert build_puzzle_store(str(csv_path), str(tmp_path / "store")) == len(PUZZLES)
+    return PuzzleStore(str(tmp_path / "store"))
+
+
+def test_random_puzzle_respects_the_rating_window_and_the_moves(store):
+    assert len(store) == len(PUZZLES)
+    rng = np.random.default_rng(0)
+    one_move = {store.random_puzzle(1500, 1, rng=rng)["rating"] for _ in range(50)}
+    assert one_move == {1450, 1520}
+    two_moves = store.random_puzzle(1500, 2, rng=rng)
+    assert two_moves == {"fen": FEN, "moves": ["e7e5", "g1f3", "b8c6", "f1b5"], "rating": 1480}
+    assert store.random_puzzle(800, 1, deviation=50, rng=rng)["rating"] == 800
+
+
+def test_random_puzzle_is_none_without_a_match(store):
+    assert store.random_puzzle(1100, 1) is None
+    assert store.random_puzzle(1500, 3) is None
+    assert store.random_puzzle(3000, 2) is None
+    assert store.random_puzzle(1500, 0) is None
@@ -0,0 +1,39 @@
+"""Tests of the Elo rating store."""
+import json
+import os
+
+import numpy as np
+
+from swiss_chess.utils.ratings import INITIAL_RATING, K_NEW, RatingStore, game_scores, rated_round_key
+
+
+def test_round_is_rated_once(tmp_path):
+    path = str(tmp_path / "ratings.json")
+    pairs = [("Alice", "Bob"), ("Carol", "Dave")]
+    scores = game_scores(pairs, ["Alice", "draw"])
+    key = rated_round_key("a1b2", 0)
+
+    store = RatingStore(path)
+    assert store.update(pairs, scores, key)
+    ratings = store.ratings_of(["Alice", "Bob", "Carol", "Dave"])
+    np.testing.assert_allclose(ratings, INITIAL_RATING + np.array([K_NEW / 2, -K_NEW / 2, 0, 0]))
+    assert not store.update(pairs, scores, key)
+    np.testing.assert_allclose(store.ratings_of(["Alice", "Bob", "Carol", "Dave"]), ratings)
+
+    # The rated rounds are kept in the file, a restarted app does not rate the round again either
+    reopened = RatingStore(path)
+    assert not reopened.update(pairs, scores, key)
+    np.testing.assert_allclose(reopened.ratings_of(["Alice", "Bob", "Carol", "Dave"]), ratings)
+    assert reopened.update(pairs, scores, rated_round_key("a1b2", 1))
+    assert reopened.games[reopened.index["Alice"]] == 2
+
+
+def test_save_replaces_the_file_without_temporary_files(tmp_path):
+    path = tmp_path / "ratings.json"
+    store = RatingStore(str(path))
+    store.update([("Alice", "Bob")], np.array([1.0]), rated_round_key("a1b2", 0))
+    store.update([("Alice", "Bob")], np.array([0.5]), rated_round_key("a1b2", 1))
+    assert os.listdir(tmp_path) == ["ratings.json"]
+    data = json.loads(path.read_text())
+    assert data["applied"] == ["a1b2:0", "a1b2:1"]
+    assert data["players"]["Alice"]["games"] == 2
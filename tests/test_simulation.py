@@ -0,0 +1,22 @@
+"""Tests of the Monte Carlo simulation of tournaments."""
+import numpy as np
+
+from swiss_chess.utils.simulation import simulate
+
+RATINGS = np.linspace(1900, 1300, 8)
+
+
+def test_results_are_the_same_for_the_same_seed_with_any_number_of_workers():
+    single = simulate(RATINGS, 3, 12, seed=7, workers=1, batch_size=4)
+    double = simulate(RATINGS, 3, 12, seed=7, workers=2, batch_size=4)
+    assert single.keys() == double.keys()
+    for key in single:
+        np.testing.assert_array_equal(single[key], double[key])
+
+
+def test_every_player_gets_one_place_per_tournament():
+    results = simulate(RATINGS, 3, 10, seed=1, workers=2, batch_size=3)
+    placements = results["placements"]
+    np.testing.assert_array_equal(placements.sum(axis=0), np.full(len(RATINGS), 10))
+    np.testing.assert_array_equal(placements.sum(axis=1), np.full(len(RATINGS), 10))
+    assert len(results["rematches"]) == 10
@@ -0,0 +1,67 @@
+"""Tests of the incremental tiebreaks against a full recompute from the games of the players."""
+import random
+
+import numpy as np
+import pytest
+
+from swiss_chess.utils.tiebreaks import TIEBREAK_SYSTEMS
+from swiss_chess.utils.tournament import Tournament
+
+
+def play(n_players: int, rounds: int, seed: int = 0) -> tuple[Tournament, np.ndarray]:
+    """Play a tournament with random results and some unplayed points, and return the progressive scores."""
+    rng = random.Random(seed)
+    tournament = Tournament([f"Player {i}" for i in range(n_players)], "score_groups")
+    progressive = np.zeros(n_players)
+    for _ in range(rounds):
+        pairs = tournament.pair_round()
+        paired = {player.name for pair in pairs for player in pair}
+        unplayed = {player.name: 1.0 for player in tournament.players if player.name not in paired}
+        tournament.record_results([rng.choice(["draw", pair[0].name, pair[1].name]) for pair in pairs], unplayed)
+        progressive += tournament.state.points[:n_players]
+    return tournament, progressive
+
+
+def recomputed_buchholz(tournament: Tournament) -> tuple[np.ndarray, np.ndarray]:
+    """Buchholz and Sonneborn-Berger from the opponents and results of every player."""
+    points = {player.name: player.points for player in tournament.players}
+    buchholz = [sum(points[name] for name in player.previous_opponents) for player in tournament.players]
+    sonneborn_berger = [
+        sum(result * points[name] for name, result in zip(player.previous_opponents, player.game_result))
+        for player in tournament.players
+    ]
+    return np.array(buchholz), np.array(sonneborn_berger)
+
+
+def recomputed_median_buchholz(tournament: Tournament) -> np.ndarray:
+    """Median Buchholz from the opponents of every player."""
+    points = {player.name: player.points for player in tournament.players}
+    values = []
+    for player in tournament.players:
+        opponents = sorted(points[name] for name in set(player.previous_opponents))
+        cut = 2 if len(opponents) >= 9 else 1 if len(opponents) >= 3 else 0
+        buchholz = sum(points[name] for name in player.previous_opponents)
+        values.append(buchholz - sum(opponents[:cut]) - sum(opponents[len(opponents) - cut :]))
+    return np.array(values)
+
+
+@pytest.mark.parametrize("rounds", [1, 2, 3, 5, 10])
+def test_incremental_tiebreaks_match_recompute(rounds):
+    tournament, progressive = play(21, rounds)
+    state = tournament.state
+    ids = np.arange(len(tournament.players))
+    buchholz, sonneborn_berger = recomputed_buchholz(tournament)
+
+    np.testing.assert_allclose(TIEBREAK_SYSTEMS["Buchholz"](state, ids), buchholz)
+    np.testing.assert_allclose(TIEBREAK_SYSTEMS["Sonneborn-Berger"](state, ids), sonneborn_berger)
+    np.testing.assert_allclose(TIEBREAK_SYSTEMS["Progressive score"](state, ids), progressive)
+    np.testing.assert_allclose(TIEBREAK_SYSTEMS["Median Buchholz"](state, ids), recomputed_median_buchholz(tournament))
+
+
+def test_median_buchholz_is_not_cut_below_three_opponents():
+    for rounds in [1, 2]:
+        tournament, _ = play(8, rounds)
+        ids = np.arange(len(tournament.players))
+        median = TIEBREAK_SYSTEMS["Median Buchholz"](tournament.state, ids)
+        np.testing.assert_allclose(median, tournament.state.buchholz[ids])
+        assert (median >= 0).all()
@@ -0,0 +1,93 @@
+"""Tests of reading and writing tournament report files."""
+import random
+from typing import List
+
+import numpy as np
+
+from swiss_chess.utils.trf import NAME_WIDTH, PLAYER_RECORD, load_trf, round_block, trf_lines, write_trf
+from swiss_chess.utils.tournament import Tournament
+
+
+def player_line(rank: int, name: str, points: float, rounds: List[tuple[int, str, str]]) -> str:
+    """Player line with the rounds as (opponent, colour, result)."""
+    line = (
+        f"{PLAYER_RECORD} {rank:4d} {'':4} {name:<{NAME_WIDTH}} {'':>4} {'':3} {'':11} {'':10} {points:4.1f} {rank:4d}"
+    )
+    return line + "".join(round_block(*block) for block in rounds)
+
+
+def played_tournament(n_players: int = 9, rounds: int = 4, seed: int = 0) -> Tournament:
+    """Tournament of the app with random results, an odd number of players gives a bye every round."""
+    rng = random.Random(seed)
+    tournament = Tournament([f"Player {i}" for i in range(n_players)], "score_groups")
+    for _ in range(rounds):
+        pairs = tournament.pair_round()
+        tournament.record_results([rng.choice(["draw", pair[0].name, pair[1].name]) for pair in pairs])
+    return tournament
+
+
+def test_parse_write_parse_roundtrip(tmp_path):
+    tournament = played_tournament()
+    path = tmp_path / "tournament.trf"
+    write_trf(tournament, str(path))
+    loaded = load_trf(str(path), "score_groups")
+
+    assert loaded.diagnostics == []
+    np.testing.assert_array_equal(loaded.state.points, tournament.state.points)
+    assert loaded.byes == tournament.byes
+    for original, player in zip(tournament.players, loaded.players):
+        assert player.name == original.name
+        assert player.previous_opponents == original.previous_opponents
+        assert player.no_game_found == original.no_game_found
+
+    # Writing the loaded tournament gives the same file
+    assert list(trf_lines(loaded)) == path.read_text().splitlines()
+
+
+def test_forfeits_are_not_games(tmp_path):
+    path = tmp_path / "forfeit.trf"
+    lines = [
+        player_line(1, "Alice", 1.0, [(2, "w", "+")]),
+        player_line(2, "Bob", 0.0, [(1, "b", "-")]),
+        player_line(3, "Carol", 1.0, [(4, "w", "1")]),
+        player_line(4, "Dave", 0.0, [(3, "b", "0")]),
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    tournament = load_trf(str(path), "score_groups")
+
+    assert tournament.diagnostics == []
+    alice, bob, carol, dave = tournament.players
+    assert [player.points for player in tournament.players] == [1.0, 0.0, 1.0, 0.0]
+    assert alice.previous_opponents == [] and bob.previous_opponents == []
+    assert carol.previous_opponents == ["Dave"]
+    assert [(pair[0].name, pair[1].name) for pair in tournament.pairs[0]] == [("Carol", "Dave")]
+    assert tournament.unplayed[0] == {"Alice": 1.0, "Bob": 0.0}
+
+    # Both players of the forfeit can still be paired with each other
+    opponents = tournament.state.opponent_matrix(np.arange(4))
+    assert not opponents[alice.id, bob.id]
+    pairs = tournament.pair_round()
+    assert len(pairs) == 2
+    assert {frozenset((pair[0].name, pair[1].name)) for pair in pairs} & {frozenset(("Carol", "Dave"))} == set()
+
+
+def test_club_ratings_are_not_written_as_fide_ratings(tmp_path):
+    tournament = Tournament(["Alice", "Bob"], "score_groups", ratings=[1500.0, 1720.0])
+    tournament.pair_round()
+    tournament.record_results(["Alice"])
+    player_lines = [line for line in trf_lines(tournament) if line.startswith(PLAYER_RECORD)]
+    assert all(not line[48:52].strip() for line in player_lines)
+
+    # The ratings of an imported file are written back
+    path = tmp_path / "rated.trf"
+    lines = [line[:48] + f"{rating:4d}" + line[52:] for line, rating in zip(player_lines, [2100, 1950])]
+    path.write_text("\n".join(lines) + "\n")
+    loaded = load_trf(str(path), "score_groups")
+    written = [line for line in trf_lines(loaded, fide_ratings=True) if line.startswith(PLAYER_RECORD)]
+    assert [line[48:52] for line in written] == ["2100", "1950"]
+
+
+def test_opponents_are_padded_with_spaces():
+    assert round_block(3, "w", "1") == "     3 w 1"
+    assert round_block(123, "b", "=") == "   123 b ="
+    assert round_block(0, "-", "Z") == "  0000 - Z"